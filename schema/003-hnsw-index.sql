@@ -0,0 +1,22 @@
+-- ============================================================================
+-- Hermes Agent HNSW Vector Index
+-- Replace the IVFFlat embedding index with HNSW for faster recall
+-- ============================================================================
+-- This script is idempotent - safe to run multiple times
+-- The HNSW index itself is built by 004-halfvec-embeddings.sql once the
+-- column has its final type, so setup_db builds it only once per run.
+
+-- Drop the original IVFFlat index only; an existing HNSW index is kept as-is.
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1
+        FROM pg_indexes
+        WHERE schemaname = 'hermes'
+          AND indexname = 'idx_memories_embedding'
+          AND indexdef ILIKE '%USING ivfflat%'
+    ) THEN
+        DROP INDEX hermes.idx_memories_embedding;
+        RAISE NOTICE 'Dropped IVFFlat index: idx_memories_embedding';
+    END IF;
+END $$;
@@ -0,0 +1,55 @@
+-- ============================================================================
+-- Hermes Agent Half-Precision Embeddings
+-- Store embeddings as halfvec (FP16) to halve row, index and scan size
+-- ============================================================================
+-- This script is idempotent - safe to run multiple times
+-- Requires pgvector 0.7.0 or newer for the halfvec type.
+
+-- Convert a full-precision column once, keeping its dimension. Any index on
+-- the old column type is dropped first; the single HNSW build follows below.
+DO $$
+DECLARE
+    dims INTEGER;
+BEGIN
+    SELECT a.atttypmod INTO dims
+    FROM pg_attribute a
+    JOIN pg_class c ON c.oid = a.attrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'hermes'
+      AND c.relname = 'memories'
+      AND a.attname = 'embedding'
+      AND a.atttypid = 'vector'::regtype;
+
+    IF dims IS NOT NULL THEN
+        DROP INDEX IF EXISTS hermes.idx_memories_embedding;
+        EXECUTE format(
+            'ALTER TABLE hermes.memories ALTER COLUMN embedding TYPE halfvec(%s) USING embedding::halfvec(%s)',
+            dims,
+            dims
+        );
+        RAISE NOTICE 'Converted hermes.memories.embedding to halfvec(%)', dims;
+    END IF;
+END $$;
+
+-- Only active rows are indexed, so soft-deleted memories never take up the
+-- ef_search candidates an HNSW scan returns. Replace an earlier full index.
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1
+        FROM pg_indexes
+        WHERE schemaname = 'hermes'
+          AND indexname = 'idx_memories_embedding'
+          AND indexdef NOT ILIKE '%WHERE (deleted_at IS NULL)%'
+    ) THEN
+        DROP INDEX hermes.idx_memories_embedding;
+        RAISE NOTICE 'Dropped non-partial index: idx_memories_embedding';
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_memories_embedding ON hermes.memories
+    USING hnsw (embedding halfvec_cosine_ops) WITH (m = 24, ef_construction = 128)
+    WHERE deleted_at IS NULL;
+
+COMMENT ON COLUMN hermes.memories.embedding IS 'Half-precision vector embedding (1536 dims for text-embedding-3-small, 3072 for 3-large)';
+COMMENT ON INDEX hermes.idx_memories_embedding IS 'HNSW index over active rows for halfvec cosine similarity search (m=24, ef_construction=128)';
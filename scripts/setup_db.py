@@ -5,7 +5,6 @@ import os
 import sys
 from pathlib import Path
 
-import psycopg2
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -31,12 +30,17 @@ def main():
         print(f"❌ No schema files found in: {schema_dir}")
         return 1
 
+    # Deferred so the early configuration-error exits skip the driver import.
+    import psycopg2
+
     print("🔌 Connecting to database...")
     try:
         conn = psycopg2.connect(db_url)
         print("✓ Connected successfully")
 
         with conn.cursor() as cur:
+            # Apply every migration in one transaction: a single commit at the
+            # end, and a failed file leaves the schema untouched.
             for migration_file in migration_files:
                 print(f"📝 Applying migration: {migration_file}")
                 with open(migration_file, "r") as f:
@@ -47,41 +51,32 @@ def main():
                     "hermes_app_password_placeholder", app_password
                 )
                 cur.execute(migration_sql)
-                conn.commit()
+            conn.commit()
 
             print(f"✓ Applied {len(migration_files)} migration file(s)")
 
-            # Verify tables exist
+            # Verify tables and their indexes in a single round trip
             cur.execute("""
-                SELECT table_name
-                FROM information_schema.tables
-                WHERE table_schema = 'hermes'
-                AND table_name = 'memories'
+                SELECT t.table_name,
+                       array_remove(array_agg(i.indexname::text ORDER BY i.indexname), NULL)
+                FROM information_schema.tables t
+                LEFT JOIN pg_indexes i
+                    ON i.schemaname = t.table_schema
+                    AND i.tablename = t.table_name
+                WHERE t.table_schema = 'hermes'
+                AND t.table_name IN ('memories', 'memory_events')
+                GROUP BY t.table_name
             """)
+            tables = dict(cur.fetchall())
 
-            if cur.fetchone():
+            if "memories" in tables:
                 print("✓ memories table created")
-
-                # Check for indexes
-                cur.execute("""
-                    SELECT indexname
-                    FROM pg_indexes
-                    WHERE tablename = 'memories'
-                """)
-                indexes = [row[0] for row in cur.fetchall()]
+                indexes = tables["memories"]
                 print(f"✓ Created {len(indexes)} indexes: {', '.join(indexes)}")
             else:
                 print("⚠️  Warning: memories table not found")
 
-            cur.execute(
-                """
-                SELECT table_name
-                FROM information_schema.tables
-                WHERE table_schema = 'hermes'
-                AND table_name = 'memory_events'
-            """
-            )
-            if cur.fetchone():
+            if "memory_events" in tables:
                 print("✓ memory_events table created")
             else:
                 print("⚠️  Warning: memory_events table not found")
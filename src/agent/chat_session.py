@@ -1,16 +1,21 @@
 """Chat session management with command handling."""
 
+from __future__ import annotations
+
 import logging
+import os
 import re
-from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+import msgspec
 
 from src.core.config import AgentConfig
 from src.core.utils import count_message_tokens, estimate_tokens, trim_context
 from src.services.llm.base import LLMService
-from src.services.memory.auto_writer import AutoMemoryWriter
-from src.services.memory.vector_store import MemoryStore
 from src.services.memory.file_storage import (
+    ChatHistoryWriter,
     load_chat_history,
     save_chat_history,
     archive_chat_history,
@@ -18,6 +23,12 @@ from src.services.memory.file_storage import (
 from src.tools.memory_tool import create_store_memory_tool
 from src.tools.tool_utils import format_tools_xml, parse_tool_calls
 
+# The memory backends pull in openai and psycopg2; they are only needed for
+# annotations here, so sessions without semantic memory never import them.
+if TYPE_CHECKING:
+    from src.services.memory.auto_writer import AutoMemoryWriter
+    from src.services.memory.vector_store import MemoryStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,8 +42,38 @@ class ChatSession:
     ANSI_CYAN = "\u001b[36m"
     ANSI_YELLOW = "\u001b[33m"
     ANSI_GREEN = "\u001b[32m"
-    EXIT_INPUTS = {"/bye", "/quit", "bye", "quit", "exit"}
+    EXIT_INPUTS = frozenset({"/bye", "/quit", "bye", "quit", "exit"})
     MEMORY_STORE_UNAVAILABLE_MSG = "❌ Memory store not available"
+    STREAM_FLUSH_CHARS = 64
+    STREAM_FLUSH_INTERVAL_SECONDS = 0.05
+
+    # Help output is constant, so it is formatted once when the class is built.
+    HELP_TEXT = (
+        "\n".join(
+            [
+                "",
+                f"{ANSI_BOLD}Commands{ANSI_RESET}",
+                f"  {ANSI_CYAN}/?{ANSI_RESET}         Show this help",
+                f"  {ANSI_CYAN}/quit{ANSI_RESET}        Exit and save",
+                f"  {ANSI_CYAN}/clear{ANSI_RESET}       Clear conversation (keeps system prompt)",
+                f"  {ANSI_CYAN}/save{ANSI_RESET}        Save conversation manually",
+                f"  {ANSI_CYAN}/load [file]{ANSI_RESET} Load saved context from JSON (defaults to saved context)",
+                f"  {ANSI_CYAN}/trim{ANSI_RESET}        Trim old messages to fit context",
+            ]
+        )
+        + "\n"
+    )
+    MEMORY_HELP_TEXT = (
+        "\n".join(
+            [
+                "",
+                f"{ANSI_BOLD}Memory{ANSI_RESET} (automatic)",
+                "  Ask naturally, for example: 'remember that I prefer Python for backend work'.",
+                f"  {ANSI_CYAN}/audit [operation]{ANSI_RESET}    Show recent memory audit events (operator view)",
+            ]
+        )
+        + "\n"
+    )
 
     def __init__(
         self,
@@ -63,6 +104,8 @@ class ChatSession:
 
         self.max_context = self.params.num_ctx
         self.max_history_tokens = int(self.max_context * 0.75)
+        # Warn once usage passes 90% of the history budget.
+        self.context_warning_tokens = self.max_history_tokens * 9 // 10
 
         if self.memory_store:
             self.system_prompt = (
@@ -74,72 +117,110 @@ class ChatSession:
                 "- Keep memories atomic and durable."
             )
 
-        self.messages: List[Dict] = [{"role": "system", "content": self.system_prompt}]
+        self.messages: List[Dict] = []
+        self._token_total = 0
+        self._history_writer = ChatHistoryWriter(self._write_history_snapshot)
+        # One system message shared by every history reset (init, /clear,
+        # /load); it is never mutated in place.
+        self._system_message: Dict[str, str] = {
+            "role": "system",
+            "content": self.system_prompt,
+        }
+        self._reset_messages([self._system_message])
 
         self.tools = []
         if self.memory_store:
             tool_func = create_store_memory_tool(self.memory_store)
             self.tools.append(tool_func)
             logger.info("Memory tool enabled")
+        # Tool callables by name, built once and shared by the native and XML
+        # tool-call paths.
+        self._tool_funcs: Dict[str, Callable[..., str]] = {
+            t.__name__: t for t in self.tools
+        }
 
         # Support manual tool injection via XML (Hermes style)
         self.use_xml_tools = self.config.parameters.use_xml_tools
         if self.use_xml_tools and self.tools:
             tools_xml = format_tools_xml(self.tools)
             if self.system_prompt:
-                self.messages[0]["content"] = f"{self.system_prompt}\n\n{tools_xml}"
+                system_content = f"{self.system_prompt}\n\n{tools_xml}"
             else:
-                self.messages[0]["content"] = tools_xml
+                system_content = tools_xml
+            self._system_message = {"role": "system", "content": system_content}
+            self._reset_messages([self._system_message])
             logger.info("Manual XML tool wiring enabled")
 
+        # Slash-command dispatch: exact matches first, then commands whose
+        # first token is followed by free-form arguments.
+        self._exact_commands: Dict[str, Callable[[], None]] = {
+            "/?": self.cmd_help,
+            "/context": lambda: self.cmd_context(show_full=True),
+            "/context brief": lambda: self.cmd_context(show_full=False),
+            "/clear": self.cmd_clear,
+            "/save": self.cmd_save,
+            "/trim": self.cmd_trim,
+        }
+        self._arg_commands: Dict[str, Callable[[str], None]] = {
+            "/load": self._run_load_command,
+        }
+        if self.memory_store:
+            self._arg_commands["/audit"] = self._run_audit_command
+
+    def _reset_messages(self, messages: List[Dict]) -> None:
+        """Replace the message history and recompute the running token total."""
+        self.messages = messages
+        self._token_total = count_message_tokens(messages)
+
+    def _write_history_snapshot(self, messages: List[Dict]) -> None:
+        """Persist a snapshot from the background writer without terminal output."""
+        save_chat_history(messages, self.context_file, announce=False)
+
+    def _wait_for_history_writes(self) -> None:
+        """Block until queued background history writes have landed on disk."""
+        try:
+            self._history_writer.flush()
+        except (OSError, msgspec.EncodeError) as e:
+            logger.warning(f"Background history save failed: {e}")
+
+    def _save_history(self) -> None:
+        """Save history synchronously after any queued background write lands."""
+        # The synchronous save below supersedes a failed background snapshot.
+        self._wait_for_history_writes()
+        save_chat_history(self.messages, self.context_file)
+
+    def _append_message(self, message: Dict) -> None:
+        """Append a message and add its estimated tokens to the running total."""
+        self.messages.append(message)
+        self._token_total += estimate_tokens(message.get("content", ""))
+
     def cmd_help(self) -> None:
         """Print available commands."""
-        print()
-        print(f"{self.ANSI_BOLD}Commands{self.ANSI_RESET}")
-        print(f"  {self.ANSI_CYAN}/?{self.ANSI_RESET}         Show this help")
-        print(f"  {self.ANSI_CYAN}/quit{self.ANSI_RESET}        Exit and save")
-        print(
-            f"  {self.ANSI_CYAN}/clear{self.ANSI_RESET}       Clear conversation (keeps system prompt)"
-        )
-        print(
-            f"  {self.ANSI_CYAN}/save{self.ANSI_RESET}        Save conversation manually"
-        )
-        print(
-            f"  {self.ANSI_CYAN}/load [file]{self.ANSI_RESET} Load saved context from JSON (defaults to saved context)"
-        )
-        print(
-            f"  {self.ANSI_CYAN}/trim{self.ANSI_RESET}        Trim old messages to fit context"
-        )
         if self.memory_store:
-            print()
-            print(f"{self.ANSI_BOLD}Memory{self.ANSI_RESET} (automatic)")
-            print(
-                "  Ask naturally, for example: "
-                "'remember that I prefer Python for backend work'."
-            )
-            print(
-                f"  {self.ANSI_CYAN}/audit [operation]{self.ANSI_RESET}    Show recent memory audit events (operator view)"
-            )
-        print()
+            print(self.HELP_TEXT + self.MEMORY_HELP_TEXT)
+        else:
+            print(self.HELP_TEXT)
 
     def cmd_quit(self) -> bool:
         """Save and quit. Returns True to signal exit."""
-        save_chat_history(self.messages, self.context_file)
+        self._save_history()
         print("Later!")
         return True
 
     def cmd_clear(self) -> None:
         """Clear conversation history and archive old messages."""
+        # The archive links the file on disk, so the last turn must land first.
+        self._wait_for_history_writes()
         archive_path = archive_chat_history(self.context_file)
-        self.messages = [{"role": "system", "content": self.system_prompt}]
-        save_chat_history(self.messages, self.context_file)
+        self._reset_messages([self._system_message])
+        self._save_history()
         if archive_path:
             print(f"📦 Previous conversation archived to {archive_path}")
         print("🗑️  Context cleared and saved!")
 
     def cmd_save(self) -> None:
         """Save current conversation history."""
-        save_chat_history(self.messages, self.context_file)
+        self._save_history()
 
     def cmd_load(self, files: Optional[List[str]] = None) -> None:
         """Load conversation history from file(s).
@@ -147,37 +228,35 @@ class ChatSession:
         Args:
             files: Optional list of file paths. If None, loads from default context_file.
         """
+        self._wait_for_history_writes()
         if not files:
             loaded_messages = load_chat_history(self.context_file)
             if loaded_messages:
-                self.messages = loaded_messages
-                self.messages[0] = {"role": "system", "content": self.system_prompt}
+                loaded_messages[0] = self._system_message
+                self._reset_messages(loaded_messages)
                 print(
                     f"{self.ANSI_GREEN}🔄 Context loaded from {self.context_file}{self.ANSI_RESET}"
                 )
             else:
-                self.messages = [{"role": "system", "content": self.system_prompt}]
+                self._reset_messages([self._system_message])
                 print(
                     f"{self.ANSI_YELLOW}⚠️  No saved context loaded from {self.context_file}{self.ANSI_RESET}"
                 )
             return
 
         combined: List[Dict] = []
-        any_loaded = False
         for f in files:
             loaded = load_chat_history(f)
             if loaded:
                 combined.extend(loaded)
-                any_loaded = True
 
-        if any_loaded:
-            self.messages = combined
-            print(
-                f"{self.ANSI_GREEN}🔄 Context loaded from: {' '.join(files)}{self.ANSI_RESET}"
-            )
+        joined = " ".join(files)
+        if combined:
+            self._reset_messages(combined)
+            print(f"{self.ANSI_GREEN}🔄 Context loaded from: {joined}{self.ANSI_RESET}")
         else:
             print(
-                f"{self.ANSI_YELLOW}⚠️  No saved context loaded from: {' '.join(files)}{self.ANSI_RESET}"
+                f"{self.ANSI_YELLOW}⚠️  No saved context loaded from: {joined}{self.ANSI_RESET}"
             )
 
     @classmethod
@@ -212,16 +291,13 @@ class ChatSession:
 
     def cmd_trim(self) -> None:
         """Trim conversation to fit within token limits."""
-        self.messages, was_trimmed = trim_context(
-            self.messages, self.max_history_tokens
-        )
+        trimmed, was_trimmed = trim_context(self.messages, self.max_history_tokens)
         if was_trimmed:
-            save_chat_history(self.messages, self.context_file)
+            self._reset_messages(trimmed)
+            self._save_history()
             print(f"✂️  Context trimmed to {len(self.messages)} messages")
         else:
-            print(
-                f"✓ Context is within limits ({count_message_tokens(self.messages)} tokens)"
-            )
+            print(f"✓ Context is within limits ({self._token_total} tokens)")
 
     def cmd_context(self, show_full: bool = False) -> None:
         """Print current conversation context.
@@ -229,23 +305,25 @@ class ChatSession:
         Args:
             show_full: If True, show full message content; otherwise truncate long messages.
         """
-        print("\n" + "=" * 60)
-        print("📋 CURRENT CONTEXT")
-        print("=" * 60)
-        total_tokens = count_message_tokens(self.messages)
-        print(
-            f"Total messages: {len(self.messages)} | Estimated tokens: {total_tokens}"
-        )
-        print("=" * 60)
+        # Assemble the whole report and print it once instead of two prints
+        # per message.
+        separator = "=" * 60
+        lines = [
+            "\n" + separator,
+            "📋 CURRENT CONTEXT",
+            separator,
+            f"Total messages: {len(self.messages)} | Estimated tokens: {self._token_total}",
+            separator,
+        ]
         for i, msg in enumerate(self.messages):
-            role = msg.get("role", "").upper()
             content = msg.get("content", "")
             tokens = estimate_tokens(content)
             if not show_full and len(content) > 100:
                 content = content[:100] + "..."
-            print(f"\n[{i}] {role} (~{tokens} tokens):")
-            print(f"  {content}")
-        print("=" * 60 + "\n")
+            lines.append(f"\n[{i}] {msg.get('role', '').upper()} (~{tokens} tokens):")
+            lines.append(f"  {content}")
+        lines.append(separator + "\n")
+        print("\n".join(lines))
 
     def cmd_audit(self, operation: Optional[str] = None) -> None:
         """Show recent memory audit events.
@@ -281,7 +359,7 @@ class ChatSession:
 
     def _append_xml_tool_response(self, payload: str) -> None:
         """Append tool response payload for XML-tool continuation flow."""
-        self.messages.append(
+        self._append_message(
             {"role": "user", "content": f"<tool_response>{payload}</tool_response>"}
         )
 
@@ -312,44 +390,30 @@ class ChatSession:
             self._append_xml_tool_response(f"Error: {e}")
             return False
 
-    def _run_command(self, user_input: str) -> bool:
-        """Run slash commands. Returns True when a command was handled."""
-        if user_input == "/?":
-            self.cmd_help()
-            return True
-
-        if user_input == "/context":
-            self.cmd_context(show_full=True)
-            return True
-
-        if user_input == "/context brief":
-            self.cmd_context(show_full=False)
-            return True
-
-        if user_input == "/clear":
-            self.cmd_clear()
-            return True
-
-        if user_input == "/save":
-            self.cmd_save()
-            return True
-
-        if user_input.startswith("/load"):
-            tokens = user_input.split()[1:]
-            self.cmd_load(files=tokens if tokens else None)
-            return True
+    def _run_load_command(self, args: str) -> None:
+        """Run /load with optional whitespace-separated file arguments."""
+        files = args.split()
+        self.cmd_load(files=files or None)
 
-        if user_input == "/trim":
-            self.cmd_trim()
-            return True
+    def _run_audit_command(self, args: str) -> None:
+        """Run /audit with an optional operation filter."""
+        self.cmd_audit(operation=args.strip() or None)
 
-        if self.memory_store and user_input.startswith("/audit"):
-            parts = user_input.split(maxsplit=1)
-            operation = parts[1].strip() if len(parts) > 1 else None
-            self.cmd_audit(operation=operation)
+    def _run_command(self, user_input: str) -> bool:
+        """Run slash commands. Returns True when a command was handled."""
+        handler = self._exact_commands.get(user_input)
+        if handler is not None:
+            handler()
             return True
 
-        return False
+        parts = user_input.split(maxsplit=1)
+        if not parts:
+            return False
+        arg_handler = self._arg_commands.get(parts[0])
+        if arg_handler is None:
+            return False
+        arg_handler(parts[1] if len(parts) > 1 else "")
+        return True
 
     def _handle_user_input(self, user_input: str) -> bool:
         """Handle one user input line. Returns True when session should exit."""
@@ -380,13 +444,13 @@ class ChatSession:
             fname = func.name
             fargs = func.arguments
 
-            if fname == "store_memory_tool" and self.memory_store:
-                tool_func = create_store_memory_tool(self.memory_store)
+            tool_func = self._tool_funcs.get(fname)
+            if fname == "store_memory_tool" and tool_func is not None:
                 result = tool_func(**fargs)
                 memory_tool_called = True
 
                 logger.info(f"Tool result: {result}")
-                self.messages.append(
+                self._append_message(
                     {
                         "role": "tool",
                         "tool_name": fname,
@@ -402,18 +466,23 @@ class ChatSession:
         Args:
             user_input: User's message text
         """
-        current_tokens = count_message_tokens(self.messages)
-        if current_tokens > self.max_history_tokens:
-            self.messages, was_trimmed = trim_context(
-                self.messages, self.max_history_tokens
+        # Count the incoming message too, so a long prompt cannot push the
+        # request past the budget before the next turn's check; the history
+        # is trimmed to leave room for it.
+        incoming_tokens = estimate_tokens(user_input)
+        if self._token_total + incoming_tokens > self.max_history_tokens:
+            trimmed, was_trimmed = trim_context(
+                self.messages, max(self.max_history_tokens - incoming_tokens, 0)
             )
             if was_trimmed:
+                self._reset_messages(trimmed)
+                # Persisted by the end-of-turn save below; saving here too
+                # would write the history twice on trimming turns.
                 print(
                     f"✂️  Auto-trimmed context to fit within {self.max_history_tokens} tokens"
                 )
-                save_chat_history(self.messages, self.context_file)
 
-        self.messages.append({"role": "user", "content": user_input})
+        self._append_message({"role": "user", "content": user_input})
 
         print("\n🤖 Assistant: ", end="", flush=True)
 
@@ -449,17 +518,18 @@ class ChatSession:
             except Exception as e:
                 logger.error(f"Auto-memory write failed: {e}", exc_info=True)
 
-        current_tokens = count_message_tokens(self.messages)
+        current_tokens = self._token_total
         usage_pct = (current_tokens / self.max_history_tokens) * 100
         print(
             f"\n📊 Messages: {len(self.messages)} | Tokens: {current_tokens}/{self.max_history_tokens} ({usage_pct:.1f}%)"
         )
 
-        if usage_pct > 90:
+        if current_tokens > self.context_warning_tokens:
             print("⚠️  Context nearly full - will auto-trim on next message")
 
-        # Persist each turn so abrupt termination loses less context.
-        save_chat_history(self.messages, self.context_file)
+        # Persist each turn so abrupt termination loses less context. The write
+        # runs in the background so the next prompt never waits on disk I/O.
+        self._history_writer.schedule(self.messages)
 
     def _resolve_ollama_tools(self) -> Optional[List[Callable[..., str]]]:
         """Resolve tool payload for Ollama requests."""
@@ -480,9 +550,16 @@ class ChatSession:
         """Stream assistant output and collect response metadata."""
         stream = self.llm_service.chat(self.messages, tools=ollama_tools, stream=True)
 
-        full_response = ""
-        thinking = ""
+        # Collect chunks in lists and join once, rather than rebuilding the
+        # response string on every streamed token.
+        response_parts: List[str] = []
+        thinking_parts: List[str] = []
         tool_calls: List[Any] = []
+        # Flush on newlines, every few dozen chars, or after a short delay
+        # instead of issuing a write syscall for every streamed token.
+        stdout = sys.stdout
+        unflushed = 0
+        last_flush = time.monotonic()
         for chunk in stream:
             msg = self._read_payload_value(chunk, "message", {})
             content = self._read_payload_value(msg, "content", "") or ""
@@ -490,17 +567,34 @@ class ChatSession:
             chunk_tools = self._read_payload_value(msg, "tool_calls", []) or []
 
             if chunk_thinking:
-                thinking += chunk_thinking
+                thinking_parts.append(chunk_thinking)
 
             if content:
-                print(content, end="", flush=True)
-                full_response += content
+                stdout.write(content)
+                response_parts.append(content)
+                unflushed += len(content)
 
             if chunk_tools:
                 tool_calls.extend(chunk_tools)
 
-        print()
-        return full_response, thinking, tool_calls
+            # Checked on every chunk: thinking-only or tool-call chunks must
+            # not hold back text already written, and text is flushed before
+            # the tool call that follows can block.
+            if unflushed:
+                now = time.monotonic()
+                if (
+                    chunk_tools
+                    or unflushed >= self.STREAM_FLUSH_CHARS
+                    or "\n" in content
+                    or now - last_flush >= self.STREAM_FLUSH_INTERVAL_SECONDS
+                ):
+                    stdout.flush()
+                    unflushed = 0
+                    last_flush = now
+
+        stdout.write("\n")
+        stdout.flush()
+        return "".join(response_parts), "".join(thinking_parts), tool_calls
 
     @staticmethod
     def _build_assistant_message(
@@ -541,7 +635,7 @@ class ChatSession:
         full_response, thinking, tool_calls = self._stream_assistant_response(
             ollama_tools=ollama_tools
         )
-        self.messages.append(
+        self._append_message(
             self._build_assistant_message(
                 full_response=full_response,
                 thinking=thinking,
@@ -563,7 +657,6 @@ class ChatSession:
         Returns:
             True if store_memory_tool was executed.
         """
-        tool_map: Dict[str, Callable[..., str]] = {t.__name__: t for t in self.tools}
         memory_tool_called = False
 
         for call in tool_calls:
@@ -578,7 +671,7 @@ class ChatSession:
                 continue
 
             if self._execute_xml_tool(
-                tool_map=tool_map, tool_name=fname, arguments=fargs
+                tool_map=self._tool_funcs, tool_name=fname, arguments=fargs
             ):
                 memory_tool_called = True
 
@@ -594,8 +687,7 @@ class ChatSession:
             print("❌ LLM service unavailable. Check logs for details.")
             return
 
-        memory_path = Path(self.context_file)
-        if memory_path.exists():
+        if os.path.exists(self.context_file):
             print(
                 f"{self.ANSI_YELLOW}⚠️  Found saved conversation at {self.context_file}.{self.ANSI_RESET} Use {self.ANSI_CYAN}/load{self.ANSI_RESET} to restore it."
             )
@@ -614,12 +706,13 @@ class ChatSession:
 
                 except KeyboardInterrupt:
                     print("\n\nSaving before exit...")
-                    save_chat_history(self.messages, self.context_file)
+                    self._save_history()
                     print("Goodbye!")
                     break
                 except Exception as e:
                     logger.error(f"Error in chat loop: {e}", exc_info=True)
                     print(f"\n❌ Error: {e}\n")
         finally:
+            self._history_writer.close()
             if self.memory_store:
                 self.memory_store.close()
@@ -1,14 +1,24 @@
+import json
 import logging
+import os
+import tempfile
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
-import yaml
+from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 logger = logging.getLogger(__name__)
 TEMPLATE_CONFIG_PATH = Path("config/template.yaml")
 
+# Validated configs keyed by resolved path, tagged with the source file's
+# (mtime_ns, size) so edits on disk invalidate the entry.
+_TEMPLATE_CACHE_MAX = 32
+_TEMPLATE_CACHE: "OrderedDict[str, tuple[int, int, AgentConfig]]" = OrderedDict()
+
 
 class Settings(BaseSettings):
     """Global application settings and environment variables."""
@@ -25,6 +35,12 @@ class Settings(BaseSettings):
     memory_events_prune_interval_seconds: int = Field(
         3600, description="Seconds between background memory_events prune attempts"
     )
+    memory_hnsw_ef_search: int = Field(
+        100, description="HNSW candidate list size (hnsw.ef_search) for recall"
+    )
+    memory_db_pool_max: int = Field(
+        25, description="Maximum pooled connections to the memory database"
+    )
     langmem_enabled: bool = True
     langmem_model: Optional[str] = None
     langmem_model_provider: str = "ollama"
@@ -39,6 +55,12 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 
+@lru_cache(maxsize=1)
+def load_environment() -> bool:
+    """Load ``.env`` into the process environment at most once per process."""
+    return load_dotenv()
+
+
 def get_settings() -> Settings:
     """Load settings from environment variables."""
     return Settings()
@@ -117,22 +139,114 @@ class AgentConfig(BaseModel):
     parameters: ModelParameters = Field(default_factory=ModelParameters)
 
 
-def load_config(config_path: Path) -> AgentConfig:
-    """Load configuration from YAML file and validate with Pydantic."""
+def _template_cache_path(config_path: Path) -> Path:
+    """Return the JSON sidecar path used to cache a parsed YAML template."""
+    return config_path.with_name(f"{config_path.name}.cache.json")
+
+
+def _read_template_cache(
+    cache_path: Path, source_stat: os.stat_result
+) -> Optional[dict]:
+    """Return cached template data when the sidecar matches the source file."""
+    try:
+        with open(cache_path, "r") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if (
+        not isinstance(cached, dict)
+        or cached.get("source_mtime_ns") != source_stat.st_mtime_ns
+        or cached.get("source_size") != source_stat.st_size
+    ):
+        return None
+    return cached.get("config")
+
+
+def _write_template_cache(
+    cache_path: Path, source_stat: os.stat_result, raw_config: dict
+) -> None:
+    """Atomically write the parsed template to its JSON sidecar (best effort)."""
+    payload = {
+        "source_mtime_ns": source_stat.st_mtime_ns,
+        "source_size": source_stat.st_size,
+        "config": raw_config,
+    }
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(
+            mode="w", dir=cache_path.parent, delete=False, suffix=".tmp"
+        ) as tmp:
+            json.dump(payload, tmp)
+            tmp_path = tmp.name
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.debug(f"Skipping template cache write for {cache_path}: {e}")
+        if tmp_path:
+            Path(tmp_path).unlink(missing_ok=True)
+
+
+def _parse_yaml_file(config_path: Path) -> Any:
+    """Parse a YAML file with the libyaml loader when available.
+
+    PyYAML is imported here rather than at module load because a warm JSON
+    sidecar means most startups never need it.
+    """
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     try:
         with open(config_path, "r") as f:
-            raw_config = yaml.safe_load(f)
+            return yaml.load(f, Loader=loader)
+    except yaml.YAMLError as e:
+        logger.error(f"Invalid YAML in config: {e}")
+        raise
 
-        config = AgentConfig(**raw_config)
-        logger.info(f"Loaded and validated config from {config_path}")
-        return config
 
+def load_config(config_path: Path) -> AgentConfig:
+    """Load configuration from YAML file and validate with Pydantic.
+
+    Validated configs are kept in an in-process cache, and the parsed YAML in
+    a ``<name>.cache.json`` sidecar, both keyed by the source file's mtime and
+    size, so unchanged templates skip the YAML parser and validation.
+    """
+    try:
+        source_stat = os.stat(config_path)
     except FileNotFoundError:
         logger.error(f"Config file not found: {config_path}")
         raise
-    except yaml.YAMLError as e:
-        logger.error(f"Invalid YAML in config: {e}")
-        raise
+
+    cache_key = str(Path(config_path).resolve())
+    cached = _TEMPLATE_CACHE.get(cache_key)
+    if (
+        cached is not None
+        and cached[0] == source_stat.st_mtime_ns
+        and cached[1] == source_stat.st_size
+    ):
+        _TEMPLATE_CACHE.move_to_end(cache_key)
+        return cached[2].model_copy(deep=True)
+
+    cache_path = _template_cache_path(Path(config_path))
+    raw_config = _read_template_cache(cache_path, source_stat)
+    if raw_config is None:
+        raw_config = _parse_yaml_file(config_path)
+        if isinstance(raw_config, dict):
+            _write_template_cache(cache_path, source_stat, raw_config)
+
+    try:
+        config = AgentConfig(**raw_config)
     except Exception as e:
         logger.error(f"Configuration validation error: {e}")
         raise
+
+    _TEMPLATE_CACHE[cache_key] = (
+        source_stat.st_mtime_ns,
+        source_stat.st_size,
+        config.model_copy(deep=True),
+    )
+    _TEMPLATE_CACHE.move_to_end(cache_key)
+    if len(_TEMPLATE_CACHE) > _TEMPLATE_CACHE_MAX:
+        _TEMPLATE_CACHE.popitem(last=False)
+
+    logger.info(f"Loaded and validated config from {config_path}")
+    return config
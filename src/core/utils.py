@@ -1,20 +1,64 @@
-from typing import List, Dict, Tuple
+from itertools import islice
+from typing import Dict, Iterable, List, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 def estimate_tokens(text: str) -> int:
-    """Rough token estimation (1 token ≈ 4 chars)."""
-    return len(text) // 4
+    """Rough token estimation.
+
+    ASCII text is counted at 1 token ≈ 4 chars. Non-ASCII characters (CJK,
+    accented text, emoji) tokenize far more densely, so each counts as ~0.6
+    tokens.
+    """
+    if text.isascii():
+        return len(text) // 4
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return int(ascii_chars * 0.25 + (len(text) - ascii_chars) * 0.6)
 
 
 def count_message_tokens(messages: list) -> int:
     """Estimate total tokens in message history."""
-    total = 0
-    for msg in messages:
-        total += estimate_tokens(msg.get("content", ""))
-    return total
+    return sum(estimate_tokens(msg.get("content", "")) for msg in messages)
+
+
+# Upper bound on the recap of dropped turns that trim_context leaves behind.
+TRIM_SUMMARY_MAX_CHARS = 2000
+TRIM_SUMMARY_SNIPPET_CHARS = 60
+
+
+def _summarize_dropped(
+    dropped: Iterable[Dict], num_trimmed: int, max_chars: int
+) -> str:
+    """Build a short recap of trimmed messages without calling the model.
+
+    Each dropped user/assistant message contributes its role and the start of
+    its content, in order, until ``max_chars`` is reached. Earlier trim
+    summaries (system messages) are skipped.
+    """
+    lines = [
+        f"[Context trimmed: {num_trimmed} older messages removed to stay within token limit]"
+    ]
+    remaining = max_chars
+    for msg in dropped:
+        role = msg.get("role", "")
+        if role == "system":
+            continue
+        content = msg.get("content", "")
+        snippet = " ".join(content[:TRIM_SUMMARY_SNIPPET_CHARS].split())
+        if not snippet:
+            continue
+        if len(content) > TRIM_SUMMARY_SNIPPET_CHARS:
+            snippet += "..."
+        line = f"- {role}: {snippet}"
+        if len(line) > remaining:
+            break
+        if len(lines) == 1:
+            lines.append("Earlier conversation:")
+        lines.append(line)
+        remaining -= len(line)
+    return "\n".join(lines)
 
 
 def trim_context(
@@ -28,35 +72,35 @@ def trim_context(
     if not messages:
         return messages, False
 
-    total_tokens = count_message_tokens(messages)
+    # Estimate every message once and reuse the counts for all totals below.
+    token_counts = [estimate_tokens(msg.get("content", "")) for msg in messages]
+    total_tokens = sum(token_counts)
 
     if total_tokens <= max_tokens:
         return messages, False
 
     # Always keep system message (first) and recent messages
     system_msg = messages[0] if messages[0].get("role") == "system" else None
-    recent_messages = messages[-keep_recent:]
+    start = max(len(messages) - keep_recent, 1 if system_msg else 0)
 
     # Calculate tokens for what we're keeping
-    kept_tokens = count_message_tokens(recent_messages)
+    kept_tokens = sum(token_counts[start:])
     if system_msg:
-        kept_tokens += estimate_tokens(system_msg.get("content", ""))
+        kept_tokens += token_counts[0]
 
-    # Build trimmed context
-    trimmed = []
-    if system_msg:
-        trimmed.append(system_msg)
-
-    # Add a summary message about what was trimmed
-    num_trimmed = len(messages) - len(recent_messages) - (1 if system_msg else 0)
+    # Build trimmed context in one pass: system message, a summary of what
+    # was dropped, then the recent messages.
+    head = [system_msg] if system_msg else []
+    num_trimmed = start - len(head)
     if num_trimmed > 0:
-        summary = {
-            "role": "system",
-            "content": f"[Context trimmed: {num_trimmed} older messages removed to stay within token limit]",
-        }
-        trimmed.append(summary)
-
-    trimmed.extend(recent_messages)
+        summary = _summarize_dropped(
+            islice(messages, len(head), start),
+            num_trimmed,
+            max_chars=min(TRIM_SUMMARY_MAX_CHARS, max_tokens // 10 * 4),
+        )
+        kept_tokens += estimate_tokens(summary)
+        head.append({"role": "system", "content": summary})
+    trimmed = [*head, *islice(messages, start, None)]
 
     logger.info(
         f"Context trimmed: {len(messages)} -> {len(trimmed)} messages, {total_tokens} -> {kept_tokens} tokens"
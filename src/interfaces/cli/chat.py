@@ -1,13 +1,17 @@
 """Command-line chat interface."""
 
+from __future__ import annotations
+
 import logging
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from src.agent.chat_session import ChatSession
 from src.core.config import AgentConfig
 from src.services.llm.base import LLMService
-from src.services.memory.auto_writer import AutoMemoryWriter
-from src.services.memory.vector_store import MemoryStore
+
+if TYPE_CHECKING:
+    from src.services.memory.auto_writer import AutoMemoryWriter
+    from src.services.memory.vector_store import MemoryStore
 
 logger = logging.getLogger(__name__)
 
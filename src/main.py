@@ -1,17 +1,18 @@
 import logging
 import signal
-from dotenv import load_dotenv
 
 from src.core.logging import setup_logging
-from src.core.config import load_config, get_settings, get_config_path
-from src.services.memory.auto_writer import AutoMemoryWriter
-from src.services.memory.langmem_extractor import LangMemExtractor
-from src.services.memory.vector_store import MemoryStore
+from src.core.config import (
+    load_config,
+    load_environment,
+    get_settings,
+    get_config_path,
+)
 from src.services.llm.ollama_service import OllamaService
 from src.interfaces.cli.chat import chat_loop
 
 # Load environment variables
-load_dotenv()
+load_environment()
 
 logger = logging.getLogger(__name__)
 
@@ -64,6 +65,12 @@ def main():
         memory_store = None
         auto_memory_writer = None
         if settings.memory_db_url:
+            # Imported here so runs without semantic memory skip loading the
+            # openai/psycopg2 client stacks.
+            from src.services.memory.auto_writer import AutoMemoryWriter
+            from src.services.memory.langmem_extractor import LangMemExtractor
+            from src.services.memory.vector_store import MemoryStore
+
             try:
                 memory_store = MemoryStore(settings=settings)
                 logger.info("Semantic memory store initialized")
@@ -1,23 +1,40 @@
-import ollama
 import logging
+import time
 from typing import List, Dict, Any, Generator
 
 logger = logging.getLogger(__name__)
 
 
 class OllamaService:
+    # Seconds a successful model check is reused before asking Ollama again.
+    CONNECTION_CHECK_TTL_SECONDS = 60.0
+
     def __init__(self, model: str, parameters: Dict[str, Any] = None):
         self.model = model
         self.parameters = parameters or {}
+        self._connection_verified_at: float | None = None
 
     def check_connection(self) -> bool:
-        """Verify Ollama is running and model is available."""
+        """Verify Ollama is running and model is available.
+
+        Successful checks are cached for ``CONNECTION_CHECK_TTL_SECONDS``;
+        failures are always retried.
+        """
+        now = time.monotonic()
+        if (
+            self._connection_verified_at is not None
+            and now - self._connection_verified_at < self.CONNECTION_CHECK_TTL_SECONDS
+        ):
+            return True
+
         try:
+            import ollama
+
             model_list = ollama.list()
-            available_models = [m["model"] for m in model_list.get("models", [])]
+            available_models = {m["model"] for m in model_list.get("models", [])}
 
-            # Check for exact match or partial match (model might have :tag)
-            model_found = any(
+            # Check for exact match, then partial match (model might have :tag)
+            model_found = self.model in available_models or any(
                 self.model in m or m in self.model for m in available_models
             )
 
@@ -28,6 +45,7 @@ class OllamaService:
                 return False
 
             logger.info(f"Ollama connection verified, model '{self.model}' available")
+            self._connection_verified_at = now
             return True
         except Exception as e:
             logger.error(f"Failed to connect to Ollama: {e}")
@@ -40,6 +58,8 @@ class OllamaService:
         stream: bool = True,
     ) -> Generator[Dict, None, None] | Dict:
         """Send chat request to Ollama."""
+        import ollama
+
         return ollama.chat(
             model=self.model,
             messages=messages,
@@ -5,7 +5,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 import logging
 import re
-from typing import List
+from typing import List, Optional
 
 from src.services.memory.langmem_extractor import LangMemExtractor, MemoryCandidate
 from src.services.memory.vector_store import MemoryStore
@@ -203,6 +203,7 @@ class AutoMemoryWriter:
         candidate: MemoryCandidate,
         source: str,
         explicit_remember: bool,
+        embedding: Optional[List[float]] = None,
     ) -> None:
         """Insert a new memory candidate and record outcome."""
         memory_id = self.memory_store.remember(
@@ -212,6 +213,7 @@ class AutoMemoryWriter:
             importance=candidate.importance,
             confidence=candidate.confidence,
             source=source,
+            embedding=embedding,
         )
         if memory_id:
             self._record_auto_remember_event(
@@ -237,6 +239,28 @@ class AutoMemoryWriter:
             default_error="Failed to store memory",
         )
 
+    def _embed_new_candidates(
+        self, candidates: List[MemoryCandidate]
+    ) -> List[Optional[List[float]]]:
+        """Embed several new candidates with one request.
+
+        A single candidate is left to ``remember()``, which only embeds when
+        reconciliation does not absorb it. On failure every entry is None so
+        each insert retries and reports its own embedding error.
+        """
+        if len(candidates) < 2:
+            return [None] * len(candidates)
+        try:
+            embeddings = self.memory_store.get_embeddings(
+                [candidate.memory_text for candidate in candidates]
+            )
+        except Exception as e:
+            logger.warning("Batch embedding failed; embedding per memory: %s", e)
+            return [None] * len(candidates)
+        if not isinstance(embeddings, list) or len(embeddings) != len(candidates):
+            return [None] * len(candidates)
+        return embeddings
+
     def process_turn(self, user_message: str, assistant_message: str) -> List[int]:
         """Extract and store memories for a chat turn.
 
@@ -268,6 +292,7 @@ class AutoMemoryWriter:
             : self.source_char_limit
         ]
 
+        new_candidates: List[MemoryCandidate] = []
         for candidate in candidates:
             if explicit_remember:
                 self._apply_explicit_remember_boost(candidate)
@@ -284,11 +309,16 @@ class AutoMemoryWriter:
                 )
                 continue
 
+            new_candidates.append(candidate)
+
+        embeddings = self._embed_new_candidates(new_candidates)
+        for candidate, embedding in zip(new_candidates, embeddings):
             self._handle_new_candidate(
                 result=result,
                 candidate=candidate,
                 source=source,
                 explicit_remember=explicit_remember,
+                embedding=embedding,
             )
 
         self.last_result = result
@@ -1,59 +1,163 @@
-import json
+import hashlib
+import os
 import shutil
 import tempfile
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple
 import logging
 
+import msgspec
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_CONTEXT_FILE = "data/memory.json"
 
+# msgspec's compiled JSON codec writes and parses bytes directly, which is
+# several times faster than the stdlib encoder for long histories.
+_json_encoder = msgspec.json.Encoder()
+_json_decoder = msgspec.json.Decoder()
+
+# Saves encode into one reusable buffer instead of allocating a fresh bytes
+# object per save. Buffers grown past the soft cap are released afterwards so
+# one huge history does not pin memory for the rest of the session.
+_SAVE_BUFFER_SOFT_CAP = 2 * 1024 * 1024
+_save_buffer = bytearray()
+_save_buffer_lock = threading.Lock()
+
+
+def _write_all(fd: int, data: bytes | bytearray) -> None:
+    """Write every byte of ``data`` to ``fd``, retrying on short writes."""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+# Digest of the messages last written to each file, plus that file's
+# (mtime_ns, size) so changes made by anyone else force a real save.
+_last_saved: Dict[str, Tuple[bytes, int, int]] = {}
+
+
+def _is_unchanged(memory_path: Path, digest: bytes) -> bool:
+    """Return True when ``memory_path`` still holds the messages we last wrote."""
+    previous = _last_saved.get(str(memory_path))
+    if previous is None or previous[0] != digest:
+        return False
+    try:
+        st = memory_path.stat()
+    except OSError:
+        return False
+    return (st.st_mtime_ns, st.st_size) == previous[1:]
+
+
+def _backup_existing(memory_path: Path) -> None:
+    """Point ``.json.bak`` at the current file before it is replaced.
+
+    A hard link shares the existing inode, so the backup costs no data copy;
+    filesystems without hard links fall back to copying.
+    """
+    if not memory_path.exists():
+        return
+    backup = memory_path.with_suffix(".json.bak")
+    backup_tmp = memory_path.with_suffix(".json.bak.tmp")
+    try:
+        backup_tmp.unlink(missing_ok=True)
+        os.link(memory_path, backup_tmp)
+        os.replace(backup_tmp, backup)
+    except OSError:
+        backup_tmp.unlink(missing_ok=True)
+        shutil.copy2(memory_path, backup)
+    logger.debug(f"Backed up to {backup}")
+
+
+def save_chat_history(
+    messages: List[Dict],
+    file_path: str = DEFAULT_CONTEXT_FILE,
+    announce: bool = True,
+):
+    """Save conversation context to file with atomic write.
+
+    Saves are skipped when the messages match what this process last wrote to
+    the file and the file has not changed on disk since.
+
+    Args:
+        messages: Conversation messages to persist.
+        file_path: Destination JSON file.
+        announce: Print a confirmation line to the terminal after saving.
+    """
+    global _save_buffer
 
-def save_chat_history(messages: List[Dict], file_path: str = DEFAULT_CONTEXT_FILE):
-    """Save conversation context to file with atomic write."""
     memory_path = Path(file_path)
     memory_path.parent.mkdir(parents=True, exist_ok=True)
-
-    data = {"timestamp": datetime.now().isoformat(), "messages": messages}
+    cache_key = str(memory_path)
 
     try:
-        # Write to temp file first
-        with tempfile.NamedTemporaryFile(
-            mode="w", dir=memory_path.parent, delete=False, suffix=".tmp"
-        ) as tmp:
-            json.dump(data, tmp, indent=2)
-            tmp_path = tmp.name
-
-        # Backup existing file
-        if memory_path.exists():
-            backup = memory_path.with_suffix(".json.bak")
-            shutil.copy2(memory_path, backup)
-            logger.debug(f"Backed up to {backup}")
-
-        # Atomic rename
-        shutil.move(tmp_path, memory_path)
-        logger.info(f"Saved {len(messages)} messages to {file_path}")
-        print(f"💾 Memory saved to {file_path}")
+        with _save_buffer_lock:
+            try:
+                _json_encoder.encode_into(messages, _save_buffer)
+                digest = hashlib.blake2b(_save_buffer, digest_size=8).digest()
+                if _is_unchanged(memory_path, digest):
+                    logger.debug(f"Skipping save, {file_path} is up to date")
+                else:
+                    header = b'{"timestamp":%s,"messages":' % _json_encoder.encode(
+                        datetime.now().isoformat()
+                    )
+                    # Write to temp file first
+                    with tempfile.NamedTemporaryFile(
+                        mode="wb", dir=memory_path.parent, delete=False, suffix=".tmp"
+                    ) as tmp:
+                        tmp_path = tmp.name
+                        fd = tmp.fileno()
+                        _write_all(fd, header)
+                        _write_all(fd, _save_buffer)
+                        _write_all(fd, b"}")
+                        os.fsync(fd)
+
+                    _backup_existing(memory_path)
+
+                    # Atomic rename (temp file lives in the same directory)
+                    os.replace(tmp_path, memory_path)
+                    st = memory_path.stat()
+                    _last_saved[cache_key] = (digest, st.st_mtime_ns, st.st_size)
+                    logger.info(f"Saved {len(messages)} messages to {file_path}")
+            finally:
+                if len(_save_buffer) > _SAVE_BUFFER_SOFT_CAP:
+                    _save_buffer = bytearray()
+
+        if announce:
+            print(f"💾 Memory saved to {file_path}")
 
     except Exception as e:
         logger.error(f"Failed to save memory: {e}")
+        _last_saved.pop(cache_key, None)
         if "tmp_path" in locals():
             Path(tmp_path).unlink(missing_ok=True)
         raise
 
 
+def _decode_history(raw: bytes) -> Dict:
+    """Decode a saved history file, rejecting non-object payloads up front."""
+    if raw[:1] != b"{" and raw.lstrip()[:1] != b"{":
+        raise msgspec.DecodeError("Expected a JSON object")
+    return _json_decoder.decode(raw)
+
+
 def load_chat_history(file_path: str = DEFAULT_CONTEXT_FILE) -> List[Dict]:
     """Load conversation context from file."""
     memory_path = Path(file_path)
-    if not memory_path.exists():
-        logger.info(f"No existing context file at {file_path}")
-        return []
 
     try:
-        with open(memory_path, "r") as f:
-            data = json.load(f)
+        # One read and one parse; a missing file is reported by the read
+        # itself rather than a separate existence check.
+        try:
+            raw = memory_path.read_bytes()
+        except FileNotFoundError:
+            logger.info(f"No existing context file at {file_path}")
+            return []
+
+        data = _decode_history(raw)
 
         messages = data.get("messages", [])
         timestamp = data.get("timestamp", "unknown")
@@ -61,15 +165,14 @@ def load_chat_history(file_path: str = DEFAULT_CONTEXT_FILE) -> List[Dict]:
         print(f"📂 Loaded memory from {timestamp}")
         return messages
 
-    except json.JSONDecodeError as e:
+    except msgspec.DecodeError as e:
         logger.error(f"Corrupted context file: {e}")
         # Try to load backup
         backup = memory_path.with_suffix(".json.bak")
         if backup.exists():
             logger.info("Attempting to load from backup")
             print("⚠️  Context file corrupted, loading from backup...")
-            with open(backup, "r") as f:
-                data = json.load(f)
+            data = _decode_history(backup.read_bytes())
             return data.get("messages", [])
         else:
             logger.error("No backup available")
@@ -91,9 +194,114 @@ def archive_chat_history(file_path: str, prefix: str = "clear") -> Optional[Path
     backup_path = memory_path.with_name(backup_name)
 
     try:
-        shutil.copy2(memory_path, backup_path)
+        # Saves always replace the file with a new inode, so a hard link is a
+        # stable snapshot that costs no data copy.
+        try:
+            os.link(memory_path, backup_path)
+        except OSError:
+            shutil.copy2(memory_path, backup_path)
         logger.info(f"Archived context before clear: {backup_path}")
         return backup_path
     except Exception as e:
         logger.warning(f"Unable to archive context snapshot: {e}")
         return None
+
+
+class ChatHistoryWriter:
+    """Persists chat history snapshots on a background thread.
+
+    Scheduling only records the latest snapshot, so a burst of turns results
+    in a single write of the newest state instead of one write per turn. A
+    failed write is re-raised from the next ``schedule()`` or ``flush()`` so it
+    reaches the caller instead of only the log.
+    """
+
+    def __init__(self, save_func: Callable[[List[Dict]], None]) -> None:
+        """Initialize writer.
+
+        Args:
+            save_func: Callable that persists one message snapshot.
+        """
+        self._save_func = save_func
+        self._condition = threading.Condition()
+        self._pending: Optional[List[Dict]] = None
+        self._busy = False
+        self._closing = False
+        self._error: Optional[Exception] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, messages: List[Dict]) -> None:
+        """Queue a snapshot for writing, replacing any unwritten snapshot.
+
+        Raises:
+            Exception: The error from a previous background write that failed.
+                The new snapshot is still queued.
+        """
+        # Shallow copy: message dicts are never mutated after being appended.
+        snapshot = list(messages)
+        with self._condition:
+            self._pending = snapshot
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="chat-history-writer", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify_all()
+            self._raise_pending_error()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until pending and in-flight writes finish.
+
+        Returns:
+            True when the writer is idle, False if the timeout expired first.
+
+        Raises:
+            Exception: The error from a background write that failed since the
+                last ``schedule()`` or ``flush()``.
+        """
+        with self._condition:
+            idle = self._condition.wait_for(
+                lambda: self._pending is None and not self._busy, timeout
+            )
+            self._raise_pending_error()
+            return idle
+
+    def _raise_pending_error(self) -> None:
+        """Re-raise and clear a stored background write error (lock held)."""
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Write any pending snapshot and stop the background thread."""
+        with self._condition:
+            thread = self._thread
+            self._closing = True
+            self._condition.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+        with self._condition:
+            self._thread = None
+            self._closing = False
+
+    def _run(self) -> None:
+        """Write snapshots until closed."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._pending is not None or self._closing
+                )
+                if self._pending is None:
+                    return
+                snapshot, self._pending = self._pending, None
+                self._busy = True
+            try:
+                self._save_func(snapshot)
+            except Exception as e:
+                logger.error(f"Background chat history save failed: {e}")
+                with self._condition:
+                    self._error = e
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
@@ -1,19 +1,21 @@
 import os
 import logging
+import threading
 import time
-from functools import lru_cache, wraps
+from collections import OrderedDict
+from functools import wraps
 from typing import Any, List, Dict, Optional, Tuple
 
 import psycopg2
 from psycopg2 import pool
+from psycopg2.extensions import make_dsn, parse_dsn
 from psycopg2.extras import RealDictCursor, Json
 from openai import OpenAI, OpenAIError, RateLimitError, APITimeoutError
-from dotenv import load_dotenv
 
-from src.core.config import Settings, get_settings
+from src.core.config import Settings, get_settings, load_environment
 
 # Load environment variables
-load_dotenv()
+load_environment()
 
 logger = logging.getLogger(__name__)
 
@@ -30,22 +32,44 @@ class MemoryEmbeddingError(RuntimeError):
     """Raised when embedding generation fails."""
 
 
+class TokenBucket:
+    """Thread-safe token bucket allowing ``capacity`` calls per ``period``."""
+
+    def __init__(self, capacity: int, period: float):
+        self.capacity = float(capacity)
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Take one token if available.
+
+        Returns:
+            0.0 when a token was taken, otherwise seconds until one refills.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.last_refill) * self.rate
+            )
+            self.last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
 def rate_limit(max_calls: int, period: float):
     """Decorator to rate limit method calls."""
-    calls = []
+    bucket = TokenBucket(capacity=max_calls, period=period)
 
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            now = time.time()
-            # Remove old calls outside period
-            calls[:] = [c for c in calls if c > now - period]
-
-            if len(calls) >= max_calls:
-                wait = period - (now - calls[0])
+            wait = bucket.try_acquire()
+            if wait:
                 raise MemoryRateLimitError(f"Rate limit exceeded. Wait {wait:.1f}s")
-
-            calls.append(now)
             return func(*args, **kwargs)
 
         return wrapper
@@ -77,6 +101,12 @@ class MemoryStore:
     DUPLICATE_IMPORTANCE_BOOST = 0.1
     DEFAULT_MEMORY_EVENTS_RETENTION_DAYS = 90
     DEFAULT_EVENT_PRUNE_INTERVAL_SECONDS = 3600
+    DEFAULT_HNSW_EF_SEARCH = 100
+    HNSW_EF_SEARCH_MAX = 1000  # pgvector's upper bound for hnsw.ef_search
+    MAX_RECALL_LIMIT = 100
+    DEFAULT_DB_POOL_MAX = 25
+    DB_KEEPALIVE_PARAMS = {"keepalives": "1", "keepalives_idle": "30"}
+    EMBEDDING_CACHE_MAX = 100
 
     def __init__(self, settings: Optional[Settings] = None):
         """Initialize semantic memory store.
@@ -114,6 +144,8 @@ class MemoryStore:
             else os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
         )
         self._last_error: Optional[Dict] = None
+        self._embedding_cache: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
 
         # Get embedding dimensions (auto-detect from model or use override)
         default_dim = self.EMBEDDING_DIMS.get(self.embedding_model, 1536)
@@ -148,6 +180,26 @@ class MemoryStore:
             ),
             field_name="memory_events_prune_interval_seconds",
         )
+        self.hnsw_ef_search = self._resolve_hnsw_ef_search(
+            value=(
+                settings.memory_hnsw_ef_search
+                if settings
+                else int(
+                    os.getenv(
+                        "MEMORY_HNSW_EF_SEARCH",
+                        str(self.DEFAULT_HNSW_EF_SEARCH),
+                    )
+                )
+            ),
+        )
+        self.db_pool_max = self._resolve_positive_int(
+            value=(
+                settings.memory_db_pool_max
+                if settings
+                else int(os.getenv("MEMORY_DB_POOL_MAX", str(self.DEFAULT_DB_POOL_MAX)))
+            ),
+            field_name="memory_db_pool_max",
+        )
         self._next_event_prune_monotonic = 0.0
 
         logger.info(
@@ -156,14 +208,39 @@ class MemoryStore:
 
         # Initialize connection pool
         try:
-            self.conn_pool = pool.SimpleConnectionPool(
-                minconn=1, maxconn=5, dsn=self.conn_string
+            # Thread-safe: the auto-memory writer and chat turn share the pool.
+            self.conn_pool = pool.ThreadedConnectionPool(
+                minconn=1,
+                maxconn=self.db_pool_max,
+                dsn=self._build_pool_dsn(self.conn_string),
             )
             logger.info("Database connection pool initialized")
         except psycopg2.Error as e:
             logger.error(f"Failed to initialize connection pool: {e}")
             raise
 
+    @classmethod
+    def _build_pool_dsn(cls, dsn: str) -> str:
+        """Add TCP keepalive defaults to a connection string.
+
+        Keepalives stop idle pooled connections from being dropped by NAT;
+        explicit values in ``dsn`` win. Keepalives are libpq socket settings,
+        not server startup parameters, so PgBouncer-style poolers accept them.
+
+        Args:
+            dsn: Connection string (URI or key/value form).
+
+        Returns:
+            Connection string with any missing keepalive parameters added.
+        """
+        params = parse_dsn(dsn)
+        keepalives = {
+            key: value
+            for key, value in cls.DB_KEEPALIVE_PARAMS.items()
+            if key not in params
+        }
+        return make_dsn(dsn, **keepalives)
+
     def _get_connection(self):
         """Get database connection from pool."""
         try:
@@ -214,6 +291,20 @@ class MemoryStore:
             raise ValueError(f"{field_name} must be greater than 0")
         return value
 
+    @classmethod
+    def _resolve_hnsw_ef_search(cls, value: int) -> int:
+        """Validate hnsw.ef_search against recall limits and pgvector's range.
+
+        An HNSW scan returns at most ``ef_search`` rows, so anything below the
+        largest recall limit could silently shorten results.
+        """
+        if not cls.MAX_RECALL_LIMIT <= value <= cls.HNSW_EF_SEARCH_MAX:
+            raise ValueError(
+                f"memory_hnsw_ef_search must be between {cls.MAX_RECALL_LIMIT} "
+                f"and {cls.HNSW_EF_SEARCH_MAX}"
+            )
+        return value
+
     @staticmethod
     def _as_dict_row(row: Optional[Dict]) -> Optional[Dict]:
         """Normalize cursor row payloads into plain dictionaries."""
@@ -733,28 +824,60 @@ class MemoryStore:
             if conn:
                 self._return_connection(conn)
 
-    @lru_cache(maxsize=100)
     def _get_embedding_cached(self, text: str) -> Tuple[float, ...]:
-        """Generate embedding with caching (tuple for hashability)."""
-        return tuple(self._get_embedding(text))
+        """Generate embedding with a per-store LRU cache (tuple for immutability)."""
+        with self._embedding_cache_lock:
+            cached = self._embedding_cache.get(text)
+            if cached is not None:
+                self._embedding_cache.move_to_end(text)
+                return cached
+
+        embedding = tuple(self._get_embedding(text))
+        with self._embedding_cache_lock:
+            self._embedding_cache[text] = embedding
+            self._embedding_cache.move_to_end(text)
+            if len(self._embedding_cache) > self.EMBEDDING_CACHE_MAX:
+                self._embedding_cache.popitem(last=False)
+        return embedding
 
     def _get_embedding(self, text: str) -> List[float]:
         """Generate embedding for text using OpenAI with error handling."""
+        return self.get_embeddings([text])[0]
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for several texts in one OpenAI request.
+
+        Args:
+            texts: Input texts, each within ``MAX_TEXT_LENGTH``.
+
+        Returns:
+            One embedding per input text, in input order.
+
+        Raises:
+            MemoryEmbeddingError: If the OpenAI request fails or returns a
+                different number of embeddings than inputs.
+        """
         logger.debug(
-            f"OpenAI embedding request: model={self.embedding_model}, input_length={len(text)}, preview={text[:100]}..."
+            f"OpenAI embedding request: model={self.embedding_model}, inputs={len(texts)}, input_length={sum(map(len, texts))}, preview={texts[0][:100] if texts else ''}..."
         )
 
         try:
             response = self.openai_client.embeddings.create(
-                model=self.embedding_model, input=text, timeout=30.0
+                model=self.embedding_model, input=texts, timeout=30.0
             )
-            embedding = response.data[0].embedding
+            if len(response.data) != len(texts):
+                raise MemoryEmbeddingError(
+                    f"Expected {len(texts)} embeddings, got {len(response.data)}"
+                )
+            # Items carry their input position; do not rely on response order.
+            ordered = sorted(response.data, key=lambda item: item.index)
+            embeddings = [item.embedding for item in ordered]
 
             logger.debug(
-                f"OpenAI embedding response: dimensions={len(embedding)}, first_5_values={embedding[:5]}, tokens_used={response.usage.total_tokens}"
+                f"OpenAI embedding response: count={len(embeddings)}, dimensions={len(embeddings[0]) if embeddings else 0}, tokens_used={response.usage.total_tokens}"
             )
 
-            return embedding
+            return embeddings
         except RateLimitError as e:
             logger.error(f"OpenAI rate limit exceeded: {e}")
             raise MemoryEmbeddingError(
@@ -905,7 +1028,6 @@ class MemoryStore:
     ) -> int:
         """Insert a new memory row and return its id."""
         with conn.cursor() as cur:
-            cur.execute("SET ivfflat.probes = 20")
             cur.execute(
                 """
                 INSERT INTO hermes.memories
@@ -968,8 +1090,8 @@ class MemoryStore:
         if type and type not in self.VALID_TYPES:
             raise ValueError(f"type must be one of {self.VALID_TYPES}")
 
-        if limit < 1 or limit > 100:
-            raise ValueError("limit must be between 1 and 100")
+        if limit < 1 or limit > self.MAX_RECALL_LIMIT:
+            raise ValueError(f"limit must be between 1 and {self.MAX_RECALL_LIMIT}")
 
     def _build_recall_query(
         self,
@@ -980,20 +1102,76 @@ class MemoryStore:
         min_importance: Optional[float],
         limit: int,
     ) -> tuple[str, List[Any]]:
-        """Build recall SQL + parameters for semantic or full-text mode."""
-        if query_embedding is not None:
-            sql = """
+        """Build recall SQL + parameters for semantic or full-text mode.
+
+        Unfiltered semantic recall orders the inner scan by the bare ``<=>``
+        distance so the partial HNSW index (``deleted_at IS NULL``) drives it,
+        then re-ranks every candidate that scan yields (``hnsw.ef_search``
+        rows) by the importance-weighted similarity. Type, tag and importance
+        filters would be applied only after the index scan, which can starve
+        the result, so filtered recall ranks exactly over the matching rows.
+        """
+        filters = ""
+        filter_params: List[Any] = []
+        if type:
+            filters += " AND type = %s"
+            filter_params.append(type)
+
+        if context:
+            filters += " AND tag LIKE %s" if "%" in context else " AND tag = %s"
+            filter_params.append(context)
+
+        if min_importance is not None:
+            filters += " AND importance >= %s"
+            filter_params.append(min_importance)
+
+        if query_embedding is not None and filters:
+            sql = f"""
                 SELECT
                     id, memory_text, type, tag, importance, confidence,
                     source, created_at, last_accessed, access_count,
                     embedding_model,
-                    (1 - (embedding <=> %s::vector)) * (1 + (importance / 3.0)) as similarity
+                    (1 - (embedding <=> %s::halfvec)) * (1 + (importance / 3.0)) as similarity
                 FROM hermes.memories
-                WHERE deleted_at IS NULL
+                WHERE deleted_at IS NULL{filters}
+                ORDER BY similarity DESC LIMIT %s
             """
-            params: List[Any] = [query_embedding]
-        else:
+            params: List[Any] = [query_embedding, *filter_params, limit]
+        elif query_embedding is not None:
             sql = """
+                SELECT
+                    id, memory_text, type, tag, importance, confidence,
+                    source, created_at, last_accessed, access_count,
+                    embedding_model,
+                    (1 - distance) * (1 + (importance / 3.0)) as similarity
+                FROM (
+                    SELECT
+                        id, memory_text, type, tag, importance, confidence,
+                        source, created_at, last_accessed, access_count,
+                        embedding_model,
+                        embedding <=> %s::halfvec as distance
+                    FROM hermes.memories
+                    WHERE deleted_at IS NULL
+                    ORDER BY embedding <=> %s::halfvec
+                    LIMIT %s
+                ) AS nearest
+                ORDER BY similarity DESC LIMIT %s
+            """
+            params = [
+                query_embedding,
+                query_embedding,
+                max(limit, self.hnsw_ef_search),
+                limit,
+            ]
+            # Sent in the same simple-query batch as the search, so the
+            # transaction-scoped setting costs no extra round trip and works
+            # behind transaction-pooling proxies.
+            return (
+                "SET LOCAL hnsw.ef_search = %s;" + self._with_access_tracking(sql),
+                [self.hnsw_ef_search, *params],
+            )
+        else:
+            sql = f"""
                 SELECT
                     id, memory_text, type, tag, importance, confidence,
                     source, created_at, last_accessed, access_count,
@@ -1001,39 +1179,30 @@ class MemoryStore:
                     ts_rank(to_tsvector('english', memory_text), plainto_tsquery('english', %s)) * (1 + (importance / 3.0)) as similarity
                 FROM hermes.memories
                 WHERE to_tsvector('english', memory_text) @@ plainto_tsquery('english', %s)
-                  AND deleted_at IS NULL
+                  AND deleted_at IS NULL{filters}
+                ORDER BY similarity DESC LIMIT %s
             """
-            params = [query, query]
-
-        if type:
-            sql += " AND type = %s"
-            params.append(type)
-
-        if context:
-            sql += " AND tag LIKE %s" if "%" in context else " AND tag = %s"
-            params.append(context)
+            params = [query, query, *filter_params, limit]
 
-        if min_importance is not None:
-            sql += " AND importance >= %s"
-            params.append(min_importance)
+        return self._with_access_tracking(sql), params
 
-        sql += " ORDER BY similarity DESC LIMIT %s"
-        params.append(limit)
-        return sql, params
+    @staticmethod
+    def _with_access_tracking(hits_sql: str) -> str:
+        """Wrap a recall SELECT so the same statement bumps access fields.
 
-    def _touch_recalled_memories(self, cur: Any, results: List[Dict]) -> None:
-        """Update access fields for recalled rows."""
-        if not results:
-            return
-        memory_ids = [row["id"] for row in results]
-        cur.execute(
-            """
-            UPDATE hermes.memories
-            SET last_accessed = NOW(), access_count = access_count + 1
-            WHERE id = ANY(%s) AND deleted_at IS NULL
-        """,
-            (memory_ids,),
-        )
+        The outer SELECT reads the pre-update snapshot, so returned rows keep
+        the access values they had before this recall.
+        """
+        return f"""
+            WITH hits AS ({hits_sql}),
+            touched AS (
+                UPDATE hermes.memories AS m
+                SET last_accessed = NOW(), access_count = m.access_count + 1
+                FROM hits
+                WHERE m.id = hits.id
+            )
+            SELECT * FROM hits ORDER BY similarity DESC
+        """
 
     @rate_limit(max_calls=10, period=60.0)
     def remember(
@@ -1045,6 +1214,7 @@ class MemoryStore:
         confidence: float = 1.0,
         source: Optional[str] = None,
         tag: Optional[str] = None,
+        embedding: Optional[List[float]] = None,
     ) -> Optional[int]:
         """
         Store a new memory.
@@ -1057,6 +1227,8 @@ class MemoryStore:
             confidence: Confidence score 0-1
             source: Brief snippet of what triggered this
             tag: Deprecated alias for context
+            embedding: Precomputed embedding for memory_text, e.g. from
+                get_embeddings(); generated on demand when omitted
 
         Returns:
             Memory ID on success, None on failure
@@ -1093,7 +1265,8 @@ class MemoryStore:
             if reconciled_id is not None:
                 return reconciled_id
 
-            embedding = self._get_embedding(memory_text)
+            if embedding is None:
+                embedding = list(self._get_embedding_cached(memory_text))
             logger.debug(
                 f"Generated embedding for storage: text_length={len(memory_text)}, embedding_dims={len(embedding)}, type={type}, tag={tag}"
             )
@@ -1221,7 +1394,7 @@ class MemoryStore:
         try:
             query_embedding: Optional[List[float]] = None
             if use_semantic:
-                query_embedding = self._get_embedding(query)
+                query_embedding = list(self._get_embedding_cached(query))
                 logger.debug(
                     "Semantic search: query_length=%s, query_preview=%s..., embedding_dims=%s",
                     len(query),
@@ -1232,7 +1405,6 @@ class MemoryStore:
             conn = self._get_connection()
 
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute("SET ivfflat.probes = 20")
                 sql, params = self._build_recall_query(
                     query=query,
                     query_embedding=query_embedding,
@@ -1243,7 +1415,6 @@ class MemoryStore:
                 )
                 cur.execute(sql, params)
                 results = cur.fetchall()
-                self._touch_recalled_memories(cur=cur, results=results)
                 if results:
                     conn.commit()
 
@@ -1,7 +1,10 @@
+from __future__ import annotations
+
 import logging
-from typing import Callable, Optional
+from typing import TYPE_CHECKING, Callable, Optional
 
-from src.services.memory.vector_store import MemoryStore
+if TYPE_CHECKING:
+    from src.services.memory.vector_store import MemoryStore
 
 logger = logging.getLogger(__name__)
 
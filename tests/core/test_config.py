@@ -1,5 +1,6 @@
 import pytest
 import yaml
+from src.core import config
 from src.core.config import load_config
 
 
@@ -27,3 +28,62 @@ def test_load_template_invalid_yaml(tmp_path):
     p.write_text("::: not yaml :::")
     with pytest.raises(Exception):
         load_config(p)
+
+
+def test_load_template_uses_safe_loader(tmp_path):
+    p = tmp_path / "unsafe.yaml"
+    p.write_text("model: !!python/object/apply:os.getcwd []\nsystem: hi\n")
+    with pytest.raises(yaml.YAMLError):
+        load_config(p)
+
+
+def test_load_template_writes_and_reuses_json_sidecar(tmp_path, monkeypatch):
+    p = tmp_path / "template.yaml"
+    p.write_text(yaml.safe_dump({"model": "llama3.2", "system": "hi"}))
+
+    load_config(p)
+    sidecar = tmp_path / "template.yaml.cache.json"
+    assert sidecar.exists()
+
+    def fail_yaml_load(*args, **kwargs):
+        raise AssertionError("YAML parser should be skipped on cache hit")
+
+    monkeypatch.setattr("yaml.load", fail_yaml_load)
+    config._TEMPLATE_CACHE.clear()
+    assert load_config(p).model == "llama3.2"
+
+
+def test_load_template_reuses_in_process_cache(tmp_path, monkeypatch):
+    p = tmp_path / "template.yaml"
+    p.write_text(yaml.safe_dump({"model": "llama3.2", "system": "hi"}))
+
+    first = load_config(p)
+    first.parameters.temperature = 0.0
+    (tmp_path / "template.yaml.cache.json").unlink()
+    monkeypatch.setattr(config, "_parse_yaml_file", None)
+
+    second = load_config(p)
+    assert second.model == "llama3.2"
+    assert second.parameters.temperature == 0.7
+    assert second is not first
+
+
+def test_load_template_sidecar_invalidated_on_change(tmp_path):
+    p = tmp_path / "template.yaml"
+    p.write_text(yaml.safe_dump({"model": "llama3.2", "system": "hi"}))
+    load_config(p)
+
+    p.write_text(yaml.safe_dump({"model": "hermes-4-14b", "system": "hello"}))
+    assert load_config(p).model == "hermes-4-14b"
+
+
+def test_load_environment_runs_dotenv_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(config, "load_dotenv", lambda: calls.append(1) or True)
+    config.load_environment.cache_clear()
+    try:
+        assert config.load_environment() is True
+        assert config.load_environment() is True
+        assert calls == [1]
+    finally:
+        config.load_environment.cache_clear()
@@ -1,4 +1,4 @@
-from src.core.utils import count_message_tokens, trim_context
+from src.core.utils import count_message_tokens, estimate_tokens, trim_context
 
 
 def test_token_estimations_and_trim():
@@ -15,3 +15,70 @@ def test_token_estimations_and_trim():
     trimmed, was_trimmed = trim_context(msgs, max_tokens=500, keep_recent=5)
     assert was_trimmed
     assert len(trimmed) <= 1 + 5 + 1  # system + summary + recent
+
+
+def test_estimate_tokens_weights_non_ascii_characters():
+    assert estimate_tokens("x" * 40) == 10
+    assert estimate_tokens("你好" * 10) == 12
+    assert estimate_tokens("abcd" + "é" * 5) == 4
+
+
+def test_trim_context_returns_input_when_within_budget():
+    msgs = [
+        {"role": "system", "content": "system prompt"},
+        {"role": "user", "content": "hi"},
+    ]
+
+    trimmed, was_trimmed = trim_context(msgs, max_tokens=500, keep_recent=5)
+    assert trimmed is msgs
+    assert not was_trimmed
+
+
+def test_trim_context_keeps_system_summary_and_recent_messages():
+    msgs = [{"role": "system", "content": "system prompt"}]
+    msgs.extend({"role": "user", "content": f"{i}" * 400} for i in range(6))
+
+    trimmed, was_trimmed = trim_context(msgs, max_tokens=300, keep_recent=2)
+    assert was_trimmed
+    assert trimmed[0] is msgs[0]
+    assert "4 older messages removed" in trimmed[1]["content"]
+    assert trimmed[2:] == msgs[-2:]
+
+
+def test_trim_context_short_history_keeps_single_system_message():
+    msgs = [
+        {"role": "system", "content": "s" * 400},
+        {"role": "user", "content": "u" * 400},
+    ]
+
+    trimmed, _ = trim_context(msgs, max_tokens=50, keep_recent=5)
+    assert trimmed == msgs
+
+
+def test_trim_context_summary_recaps_dropped_turns():
+    msgs = [
+        {"role": "system", "content": "system prompt"},
+        {"role": "user", "content": "I prefer Python\nfor backend work"},
+        {"role": "assistant", "content": "y" * 4000},
+        {"role": "system", "content": "[Context trimmed: 3 older messages removed]"},
+        {"role": "user", "content": "recent"},
+    ]
+
+    trimmed, _ = trim_context(msgs, max_tokens=900, keep_recent=1)
+    summary = trimmed[1]["content"].splitlines()
+    assert summary[0].startswith("[Context trimmed: 3 older messages removed")
+    assert summary[1:] == [
+        "Earlier conversation:",
+        "- user: I prefer Python for backend work",
+        f"- assistant: {'y' * 60}...",
+    ]
+
+
+def test_trim_context_summary_respects_budget():
+    msgs = [{"role": "system", "content": "system prompt"}]
+    msgs.extend({"role": "user", "content": "z" * 400} for _ in range(50))
+
+    trimmed, _ = trim_context(msgs, max_tokens=500, keep_recent=2)
+    recap = trimmed[1]["content"].splitlines()[2:]
+    # 200-char budget fits two 71-char lines.
+    assert recap == [f"- user: {'z' * 60}..."] * 2
@@ -109,6 +109,7 @@ def test_send_message_integration_stores_auto_memory_from_extractor():
 
     with patch("src.agent.chat_session.save_chat_history"):
         session._send_message("Remember that I like espresso")
+        session._history_writer.flush()
 
     assert len(store.remember_calls) == 1
     assert store.remember_calls[0]["memory_text"] == "User likes espresso"
@@ -148,6 +149,7 @@ def test_send_message_integration_skips_auto_writer_after_native_tool_call():
 
     with patch("src.agent.chat_session.save_chat_history"):
         session._send_message("Remember this preference")
+        session._history_writer.flush()
 
     assert len(store.remember_calls) == 1
     auto_writer.process_turn.assert_not_called()
@@ -167,6 +169,7 @@ def test_send_message_integration_handles_extractor_exception_without_crashing()
 
     with patch("src.agent.chat_session.save_chat_history"):
         session._send_message("hello there")
+        session._history_writer.flush()
 
     assert store.remember_calls == []
     assert auto_writer.last_result.all_ids == []
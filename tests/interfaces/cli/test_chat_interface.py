@@ -80,6 +80,23 @@ def test_cmd_load_no_files_found(capsys):
         assert "No saved context loaded from: bad.json" in out
 
 
+def test_cmd_load_skips_files_without_messages(capsys):
+    """Files that load no messages are skipped rather than extended."""
+    session = ChatSession(
+        config=AgentConfig(model="test", system="sys", parameters={}),
+        context_file="default.json",
+        llm_service=MagicMock(spec=OllamaService),
+    )
+
+    with patch("src.agent.chat_session.load_chat_history") as mock_load:
+        mock_load.side_effect = [None, [{"role": "user", "content": "1"}]]
+
+        session.cmd_load(["null.json", "good.json"])
+
+    assert session.messages == [{"role": "user", "content": "1"}]
+    assert "Context loaded from: null.json good.json" in capsys.readouterr().out
+
+
 def test_cmd_load_default_success(capsys):
     """Test loading default context successfully."""
     session = ChatSession(
@@ -208,6 +225,7 @@ def test_send_message_surfaces_full_auto_memory_failure_and_saves(capsys):
 
     with patch("src.agent.chat_session.save_chat_history") as mock_save:
         session._send_message("hello")
+        session._history_writer.flush()
 
     out = capsys.readouterr().out
     assert "remember exact string that failed to write" in out
@@ -240,6 +258,7 @@ def test_send_message_sanitizes_auto_memory_failure_output(capsys):
 
     with patch("src.agent.chat_session.save_chat_history"):
         session._send_message("hello")
+        session._history_writer.flush()
 
     out = capsys.readouterr().out
     assert "\x1b[" not in out
@@ -2,13 +2,22 @@
 
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from src.agent.chat_session import ChatSession
 from src.core.config import AgentConfig
+from src.core.utils import count_message_tokens
 from src.services.llm.ollama_service import OllamaService
+from src.services.memory.file_storage import (
+    ChatHistoryWriter,
+    load_chat_history,
+    save_chat_history,
+)
 
 
 def _make_session(
@@ -96,13 +105,32 @@ def test_cmd_trim_saves_when_trimmed():
 
 def test_cmd_trim_reports_when_not_trimmed(capsys):
     session = _make_session()
+    session._token_total = 42
     with patch(
         "src.agent.chat_session.trim_context", return_value=(session.messages, False)
     ):
-        with patch("src.agent.chat_session.count_message_tokens", return_value=42):
-            session.cmd_trim()
+        session.cmd_trim()
     out = capsys.readouterr().out
-    assert "Context is within limits" in out
+    assert "Context is within limits (42 tokens)" in out
+
+
+def test_cmd_context_prints_report_once(capsys):
+    session = _make_session()
+    session._append_message({"role": "user", "content": "x" * 120})
+
+    with patch("builtins.print", wraps=print) as mock_print:
+        session.cmd_context()
+
+    assert mock_print.call_count == 1
+    sep = "=" * 60
+    assert capsys.readouterr().out == (
+        f"\n{sep}\n📋 CURRENT CONTEXT\n{sep}\n"
+        "Total messages: 2 | Estimated tokens: 30\n"
+        f"{sep}\n"
+        "\n[0] SYSTEM (~0 tokens):\n  sys\n"
+        f"\n[1] USER (~30 tokens):\n  {'x' * 100}...\n"
+        f"{sep}\n\n"
+    )
 
 
 def test_cmd_audit_without_memory_store(capsys):
@@ -195,6 +223,17 @@ def test_run_command_parses_audit_operation():
     session.cmd_audit.assert_called_once_with(operation="forget")
 
 
+def test_run_command_dispatches_load_arguments_and_ignores_unknown():
+    session = _make_session()
+    session.cmd_load = MagicMock()
+
+    assert session._run_command("/load a.json b.json") is True
+    session.cmd_load.assert_called_once_with(files=["a.json", "b.json"])
+    assert session._run_command("/audit") is False
+    assert session._run_command("/unknown") is False
+    assert session._run_command("") is False
+
+
 def test_init_with_xml_tools_appends_markup_when_memory_enabled():
     with patch("src.agent.chat_session.format_tools_xml", return_value="<tools/>"):
         session = _make_session(
@@ -207,6 +246,63 @@ def test_init_with_xml_tools_appends_markup_when_memory_enabled():
     assert "Memory policy:" in content
 
 
+def test_cmd_clear_and_load_keep_xml_tool_system_message():
+    with patch("src.agent.chat_session.format_tools_xml", return_value="<tools/>"):
+        session = _make_session(use_xml_tools=True, memory_store=MagicMock())
+    system_message = session.messages[0]
+
+    with patch("src.agent.chat_session.archive_chat_history", return_value=None):
+        with patch("src.agent.chat_session.save_chat_history"):
+            session.cmd_clear()
+    assert session.messages == [system_message]
+
+    loaded = [{"role": "system", "content": "stale"}, {"role": "user", "content": "hi"}]
+    with patch("src.agent.chat_session.load_chat_history", return_value=loaded):
+        session.cmd_load()
+    assert session.messages[0] is system_message
+    assert "<tools/>" in session.messages[0]["content"]
+
+
+def _session_with_blocked_writer(tmp_path):
+    """Session whose background history writes wait for the returned event."""
+    session = _make_session()
+    session.context_file = str(tmp_path / "ctx.json")
+    release = threading.Event()
+
+    def slow_save(messages):
+        release.wait(timeout=5)
+        session._write_history_snapshot(messages)
+
+    session._history_writer = ChatHistoryWriter(slow_save)
+    session._append_message({"role": "user", "content": "turn1"})
+    save_chat_history(session.messages, session.context_file, announce=False)
+    session._append_message({"role": "user", "content": "turn2-LAST"})
+    session._history_writer.schedule(session.messages)
+    threading.Timer(0.05, release.set).start()
+    return session
+
+
+def test_cmd_clear_archives_the_last_scheduled_turn(tmp_path):
+    session = _session_with_blocked_writer(tmp_path)
+
+    session.cmd_clear()
+    session._history_writer.close()
+
+    (archive,) = tmp_path.glob("ctx-clear-*.json")
+    archived = [m["content"] for m in load_chat_history(str(archive))]
+    assert archived[-1] == "turn2-LAST"
+
+
+def test_cmd_load_reads_the_last_scheduled_turn(tmp_path):
+    session = _session_with_blocked_writer(tmp_path)
+    session._reset_messages([session._system_message])
+
+    session.cmd_load()
+    session._history_writer.close()
+
+    assert session.messages[-1]["content"] == "turn2-LAST"
+
+
 def test_handle_user_input_handles_exit_and_empty_cases():
     session = _make_session()
     session.cmd_quit = MagicMock(return_value=True)
@@ -220,7 +316,6 @@ def test_handle_user_input_handles_exit_and_empty_cases():
 
 def test_handle_tool_calls_executes_memory_tool_and_appends_tool_message():
     store = MagicMock()
-    session = _make_session(memory_store=store)
     call = _ToolCall(
         function=_ToolFunction(
             name="store_memory_tool",
@@ -228,13 +323,18 @@ def test_handle_tool_calls_executes_memory_tool_and_appends_tool_message():
         )
     )
     mock_tool = MagicMock(return_value="Stored memory #7")
+    mock_tool.__name__ = "store_memory_tool"
     with patch(
         "src.agent.chat_session.create_store_memory_tool", return_value=mock_tool
-    ):
+    ) as mock_factory:
+        session = _make_session(memory_store=store)
         called = session._handle_tool_calls([call])
+        called_again = session._handle_tool_calls([call])
 
-    assert called is True
-    mock_tool.assert_called_once()
+    assert called is True and called_again is True
+    # The tool is built once in __init__ and reused for every call.
+    mock_factory.assert_called_once_with(store)
+    assert mock_tool.call_count == 2
     assert session.messages[-1]["role"] == "tool"
 
 
@@ -250,31 +350,146 @@ def test_send_message_skips_auto_writer_for_blank_assistant_text():
     session._handle_response = MagicMock(return_value=("   ", False))
     with patch("src.agent.chat_session.save_chat_history"):
         session._send_message("hello")
+        session._history_writer.flush()
     auto_writer.process_turn.assert_not_called()
 
 
+def test_save_history_logs_background_failure_and_still_saves(caplog):
+    session = _make_session()
+    session._history_writer.flush = MagicMock(side_effect=OSError("disk full"))
+
+    with patch("src.agent.chat_session.save_chat_history") as mock_save:
+        session.cmd_save()
+
+    assert "Background history save failed: disk full" in caplog.text
+    mock_save.assert_called_once_with(session.messages, session.context_file)
+
+
+def test_save_history_does_not_hide_unexpected_writer_errors():
+    session = _make_session()
+    session._history_writer.flush = MagicMock(side_effect=TypeError("bug"))
+
+    with patch("src.agent.chat_session.save_chat_history") as mock_save:
+        with pytest.raises(TypeError, match="bug"):
+            session.cmd_save()
+
+    mock_save.assert_not_called()
+
+
 def test_send_message_skips_extra_save_when_auto_trim_not_applied():
     session = _make_session()
     session._handle_response = MagicMock(return_value=("assistant", False))
 
-    with patch("src.agent.chat_session.count_message_tokens", side_effect=[999, 20]):
-        with patch(
-            "src.agent.chat_session.trim_context",
-            return_value=(session.messages, False),
-        ):
-            with patch("src.agent.chat_session.save_chat_history") as mock_save:
-                session._send_message("hello")
+    session._token_total = 999
+    with patch(
+        "src.agent.chat_session.trim_context",
+        return_value=(session.messages, False),
+    ):
+        with patch("src.agent.chat_session.save_chat_history") as mock_save:
+            session._send_message("hello")
+            session._history_writer.flush()
 
     # Only the final per-turn persistence should run.
     mock_save.assert_called_once()
 
 
+def test_send_message_saves_once_when_auto_trim_applied():
+    session = _make_session()
+    session._handle_response = MagicMock(return_value=("assistant", False))
+    trimmed = [session.messages[0]]
+
+    session._token_total = 999
+    with patch(
+        "src.agent.chat_session.trim_context",
+        return_value=(trimmed, True),
+    ):
+        with patch("src.agent.chat_session.save_chat_history") as mock_save:
+            session._send_message("hello")
+            session._history_writer.flush()
+
+    mock_save.assert_called_once()
+
+
+def test_send_message_auto_trims_when_incoming_message_exceeds_budget():
+    session = _make_session()
+    session._handle_response = MagicMock(return_value=("assistant", False))
+
+    session._token_total = 90
+    with patch(
+        "src.agent.chat_session.trim_context",
+        return_value=(session.messages, False),
+    ) as mock_trim:
+        with patch("src.agent.chat_session.save_chat_history"):
+            session._send_message("x" * 40)
+            session._history_writer.flush()
+
+    mock_trim.assert_called_once()
+    assert mock_trim.call_args[0][1] == session.max_history_tokens - 10
+
+
+def test_send_message_trim_leaves_room_for_incoming_message():
+    session = _make_session()
+    assert session.max_history_tokens == 96
+    history = [session.messages[0]]
+    history += [{"role": "user", "content": "o" * 60} for _ in range(4)]
+    history += [{"role": "assistant", "content": "r" * 8} for _ in range(10)]
+    session._reset_messages(history)
+    assert session._token_total == 80
+
+    def fake_response():
+        session._append_message({"role": "assistant", "content": "ok"})
+        return "ok", False
+
+    session._handle_response = MagicMock(side_effect=fake_response)
+    with patch("src.agent.chat_session.save_chat_history"):
+        session._send_message("p" * 200)
+        session._history_writer.flush()
+
+    assert session._token_total == count_message_tokens(session.messages)
+    assert session._token_total <= session.max_history_tokens
+    assert session.messages[-2]["content"] == "p" * 200
+
+
+def test_send_message_keeps_running_token_total_in_sync():
+    session = _make_session()
+
+    def fake_response():
+        session._append_message({"role": "assistant", "content": "a" * 40})
+        return "a" * 40, False
+
+    session._handle_response = MagicMock(side_effect=fake_response)
+    with patch("src.agent.chat_session.save_chat_history"):
+        session._send_message("u" * 20)
+        session._history_writer.flush()
+
+    assert session._token_total == count_message_tokens(session.messages)
+
+
+def test_send_message_warns_only_past_ninety_percent_of_budget(capsys):
+    session = _make_session()
+    assert session.max_history_tokens == 96
+
+    for total, warned in ((86, False), (87, True)):
+
+        def fake_response(total=total):
+            session._token_total = total
+            return "ok", False
+
+        session._handle_response = MagicMock(side_effect=fake_response)
+        with patch("src.agent.chat_session.save_chat_history"):
+            session._send_message("hi")
+            session._history_writer.flush()
+
+        assert ("Context nearly full" in capsys.readouterr().out) is warned
+
+
 def test_send_message_skips_auto_writer_when_memory_tool_already_called():
     auto_writer = MagicMock()
     session = _make_session(auto_memory_writer=auto_writer)
     session._handle_response = MagicMock(return_value=("assistant", True))
     with patch("src.agent.chat_session.save_chat_history"):
         session._send_message("hello")
+        session._history_writer.flush()
     auto_writer.process_turn.assert_not_called()
 
 
@@ -290,6 +505,7 @@ def test_send_message_logs_auto_writer_exceptions():
     with patch("src.agent.chat_session.save_chat_history"):
         with patch("src.agent.chat_session.logger.error") as mock_error:
             session._send_message("hello")
+            session._history_writer.flush()
 
     mock_error.assert_called()
 
@@ -304,6 +520,7 @@ def test_send_message_prints_refreshed_memory_ids(capsys):
     session._handle_response = MagicMock(return_value=("assistant", False))
     with patch("src.agent.chat_session.save_chat_history"):
         session._send_message("hello")
+        session._history_writer.flush()
 
     out = capsys.readouterr().out
     assert "Auto-memory refreshed: 12" in out
@@ -367,6 +584,68 @@ def test_stream_assistant_response_captures_tool_calls_without_content():
     assert tool_calls == [tool_call]
 
 
+def test_stream_assistant_response_batches_stdout_flushes(monkeypatch):
+    mock_llm = MagicMock(spec=OllamaService)
+    mock_llm.chat.return_value = iter(
+        [
+            _Chunk(_ChunkMessage(content=token, thinking=None, tool_calls=[]))
+            for token in ["a", "b", "c", "line\n", "d"]
+        ]
+    )
+    fake_stdout = MagicMock()
+    monkeypatch.setattr("src.agent.chat_session.sys.stdout", fake_stdout)
+    monkeypatch.setattr("src.agent.chat_session.time.monotonic", lambda: 0.0)
+    session = _make_session(llm_service=mock_llm)
+
+    response, _, _ = session._stream_assistant_response(ollama_tools=None)
+
+    assert response == "abcline\nd"
+    # One flush for the newline chunk, one at end of stream.
+    assert fake_stdout.flush.call_count == 2
+
+
+def test_stream_assistant_response_flushes_on_deadline_during_thinking(monkeypatch):
+    mock_llm = MagicMock(spec=OllamaService)
+    mock_llm.chat.return_value = iter(
+        [
+            _Chunk(_ChunkMessage(content="a", thinking=None, tool_calls=[])),
+            _Chunk(_ChunkMessage(content="", thinking="hmm", tool_calls=[])),
+        ]
+    )
+    clock = iter([0.0, 0.0, 1.0])
+    fake_stdout = MagicMock()
+    monkeypatch.setattr("src.agent.chat_session.sys.stdout", fake_stdout)
+    monkeypatch.setattr("src.agent.chat_session.time.monotonic", lambda: next(clock))
+    session = _make_session(llm_service=mock_llm)
+
+    session._stream_assistant_response(ollama_tools=None)
+
+    # The pending "a" is flushed once the deadline passes on a thinking-only
+    # chunk, then again at end of stream.
+    assert fake_stdout.flush.call_count == 2
+
+
+def test_stream_assistant_response_flushes_before_tool_calls(monkeypatch):
+    call = _ToolCall(function=_ToolFunction(name="x", arguments={}))
+    mock_llm = MagicMock(spec=OllamaService)
+    mock_llm.chat.return_value = iter(
+        [
+            _Chunk(_ChunkMessage(content="a", thinking=None, tool_calls=[])),
+            _Chunk(_ChunkMessage(content="", thinking=None, tool_calls=[call])),
+        ]
+    )
+    fake_stdout = MagicMock()
+    monkeypatch.setattr("src.agent.chat_session.sys.stdout", fake_stdout)
+    monkeypatch.setattr("src.agent.chat_session.time.monotonic", lambda: 0.0)
+    session = _make_session(llm_service=mock_llm)
+
+    _, _, tool_calls = session._stream_assistant_response(ollama_tools=None)
+
+    assert tool_calls == [call]
+    # One flush when the tool call arrives, one at end of stream.
+    assert fake_stdout.flush.call_count == 2
+
+
 def test_build_assistant_message_omits_optional_fields_when_empty():
     payload = ChatSession._build_assistant_message(
         full_response="ok",
@@ -30,6 +30,28 @@ def test_check_connection_allows_partial_model_matches():
         assert service.check_connection() is True
 
 
+def test_check_connection_reuses_recent_success():
+    with patch("ollama.list") as mock_list:
+        mock_list.return_value = {"models": [{"model": "llama3.2"}]}
+        service = OllamaService(model="llama3.2")
+        assert service.check_connection() is True
+        assert service.check_connection() is True
+
+    mock_list.assert_called_once()
+
+
+def test_check_connection_retries_after_failure():
+    with patch("ollama.list") as mock_list:
+        mock_list.return_value = {"models": []}
+        service = OllamaService(model="llama3.2")
+        assert service.check_connection() is False
+
+        mock_list.return_value = {"models": [{"model": "llama3.2"}]}
+        assert service.check_connection() is True
+
+    assert mock_list.call_count == 2
+
+
 def test_chat_forwards_payload_to_ollama():
     expected = iter([{"message": {"content": "ok"}}])
     with patch("ollama.chat", return_value=expected) as mock_chat:
@@ -198,6 +198,53 @@ def test_auto_writer_records_failure_when_duplicate_revive_fails():
     assert writer.last_result.failures[0].error == "write conflict"
 
 
+def test_auto_writer_batches_embeddings_for_new_candidates():
+    store = MagicMock(spec=MemoryStore)
+    store.memory_exists.return_value = False
+    store.get_embeddings.return_value = [[0.1], [0.2]]
+    store.remember.side_effect = [1, 2]
+
+    extractor = MagicMock(spec=LangMemExtractor)
+    extractor.extract.return_value = [
+        MemoryCandidate(
+            memory_text="User prefers vim", type="preference", tag="coding"
+        ),
+        MemoryCandidate(memory_text="User has standup", type="task", tag="work"),
+    ]
+
+    writer = AutoMemoryWriter(memory_store=store, extractor=extractor)
+    ids = writer.process_turn(user_message="vim, standup", assistant_message="Noted.")
+
+    assert ids == [1, 2]
+    store.get_embeddings.assert_called_once_with(
+        ["User prefers vim", "User has standup"]
+    )
+    embeddings = [call.kwargs["embedding"] for call in store.remember.call_args_list]
+    assert embeddings == [[0.1], [0.2]]
+
+
+def test_auto_writer_falls_back_to_per_memory_embedding_on_batch_failure():
+    store = MagicMock(spec=MemoryStore)
+    store.memory_exists.return_value = False
+    store.get_embeddings.side_effect = RuntimeError("rate limited")
+    store.remember.side_effect = [1, 2]
+
+    extractor = MagicMock(spec=LangMemExtractor)
+    extractor.extract.return_value = [
+        MemoryCandidate(
+            memory_text="User prefers vim", type="preference", tag="coding"
+        ),
+        MemoryCandidate(memory_text="User has standup", type="task", tag="work"),
+    ]
+
+    writer = AutoMemoryWriter(memory_store=store, extractor=extractor)
+    ids = writer.process_turn(user_message="vim, standup", assistant_message="Noted.")
+
+    assert ids == [1, 2]
+    embeddings = [call.kwargs["embedding"] for call in store.remember.call_args_list]
+    assert embeddings == [None, None]
+
+
 def test_langmem_extractor_init_and_extract_with_fake_sdk(monkeypatch):
     fake_llm = object()
     manager = MagicMock()
@@ -1,7 +1,10 @@
 import pytest
 import json
+import threading
 from pathlib import Path
+from src.services.memory import file_storage
 from src.services.memory.file_storage import (
+    ChatHistoryWriter,
     save_chat_history,
     load_chat_history,
     archive_chat_history,
@@ -19,7 +22,8 @@ def test_save_and_load_memory_roundtrip(tmp_path):
     save_chat_history(messages, file_path=mem_file)
     assert Path(mem_file).exists()
 
-    # Save second time to cause backup
+    # Save changed history to cause backup
+    messages.append({"role": "assistant", "content": "hi"})
     save_chat_history(messages, file_path=mem_file)
     backup = Path(mem_file).with_suffix(".json.bak")
     assert backup.exists()
@@ -47,6 +51,21 @@ def test_load_memory_corrupted_uses_backup(tmp_path):
     assert msgs == [{"role": "user", "content": "from backup"}]
 
 
+def test_load_memory_non_object_uses_backup(tmp_path):
+    mem_file = tmp_path / "memory.json"
+    mem_file.write_text("[]")
+    (tmp_path / "memory.json.bak").write_text(
+        json.dumps({"messages": [{"role": "user", "content": "from backup"}]})
+    )
+
+    msgs = load_chat_history(str(mem_file))
+    assert msgs == [{"role": "user", "content": "from backup"}]
+
+
+def test_load_memory_missing_file_returns_empty(tmp_path):
+    assert load_chat_history(str(tmp_path / "missing.json")) == []
+
+
 def test_archive_memory_snapshot(tmp_path):
     mem_file = tmp_path / "memory.json"
     mem_file.write_text(json.dumps({"messages": [{"role": "user", "content": "hi"}]}))
@@ -70,14 +89,172 @@ def test_save_memory_failure(monkeypatch, tmp_path):
         save_chat_history(messages, file_path=mem_file)
 
 
+def test_archive_memory_snapshot_survives_later_save(tmp_path):
+    mem_file = tmp_path / "memory.json"
+    save_chat_history([{"role": "user", "content": "old"}], file_path=str(mem_file))
+
+    archived = archive_chat_history(str(mem_file), prefix="clear")
+    save_chat_history([{"role": "user", "content": "new"}], file_path=str(mem_file))
+
+    assert load_chat_history(str(archived)) == [{"role": "user", "content": "old"}]
+
+
+def test_archive_memory_snapshot_falls_back_to_copy(monkeypatch, tmp_path):
+    mem_file = tmp_path / "memory.json"
+    mem_file.write_text("{}")
+
+    def raise_link(*a, **k):
+        raise OSError("cross-device link")
+
+    monkeypatch.setattr("os.link", raise_link)
+    archived = archive_chat_history(str(mem_file), prefix="x")
+    assert archived is not None
+    assert archived.read_text() == "{}"
+
+
 def test_archive_memory_snapshot_failure(monkeypatch, tmp_path):
     mem_file = tmp_path / "memory.json"
     mem_file.write_text("{}")
 
-    # Make copy2 raise
+    # Make both the hard link and the copy fallback fail
+    def raise_link(*a, **k):
+        raise OSError("link fail")
+
     def raise_copy(*a, **k):
         raise RuntimeError("copy fail")
 
+    monkeypatch.setattr("os.link", raise_link)
     monkeypatch.setattr("shutil.copy2", raise_copy)
     res = archive_chat_history(str(mem_file), prefix="x")
     assert res is None
+
+
+def test_save_memory_writes_compact_json(tmp_path):
+    mem_file = tmp_path / "memory.json"
+    save_chat_history([{"role": "user", "content": "hi"}], file_path=str(mem_file))
+
+    raw = mem_file.read_text()
+    assert "\n" not in raw
+    assert json.loads(raw)["messages"] == [{"role": "user", "content": "hi"}]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_save_memory_releases_oversized_buffer(monkeypatch, tmp_path):
+    mem_file = tmp_path / "memory.json"
+    monkeypatch.setattr(file_storage, "_SAVE_BUFFER_SOFT_CAP", 16)
+    messages = [{"role": "user", "content": "x" * 64}]
+
+    save_chat_history(messages, file_path=str(mem_file))
+
+    assert len(file_storage._save_buffer) == 0
+    assert load_chat_history(str(mem_file)) == messages
+
+
+def test_save_memory_skips_unchanged_history(tmp_path):
+    mem_file = tmp_path / "memory.json"
+    messages = [{"role": "user", "content": "hi"}]
+    save_chat_history(messages, file_path=str(mem_file))
+    first = mem_file.stat()
+
+    save_chat_history(messages, file_path=str(mem_file))
+
+    assert mem_file.stat().st_ino == first.st_ino
+    assert not (tmp_path / "memory.json.bak").exists()
+
+
+def test_save_memory_rewrites_when_file_changed_on_disk(tmp_path):
+    mem_file = tmp_path / "memory.json"
+    messages = [{"role": "user", "content": "hi"}]
+    save_chat_history(messages, file_path=str(mem_file))
+    mem_file.write_text("{}")
+
+    save_chat_history(messages, file_path=str(mem_file))
+
+    assert load_chat_history(str(mem_file)) == messages
+
+
+def test_save_memory_backup_is_hard_link_to_previous_file(tmp_path):
+    mem_file = tmp_path / "memory.json"
+    save_chat_history([{"role": "user", "content": "one"}], file_path=str(mem_file))
+    previous_inode = mem_file.stat().st_ino
+
+    save_chat_history([{"role": "user", "content": "two"}], file_path=str(mem_file))
+
+    backup = tmp_path / "memory.json.bak"
+    assert backup.stat().st_ino == previous_inode
+    assert load_chat_history(str(backup)) == [{"role": "user", "content": "one"}]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_chat_history_writer_persists_latest_snapshot(tmp_path):
+    mem_file = str(tmp_path / "memory.json")
+    writer = ChatHistoryWriter(
+        lambda messages: save_chat_history(messages, mem_file, announce=False)
+    )
+    messages = [{"role": "user", "content": "first"}]
+
+    writer.schedule(messages)
+    messages.append({"role": "assistant", "content": "second"})
+    writer.schedule(messages)
+    writer.close()
+
+    assert load_chat_history(mem_file) == messages
+
+
+def test_chat_history_writer_snapshot_is_isolated_from_later_appends():
+    release = threading.Event()
+    written = []
+
+    def slow_save(messages):
+        release.wait(timeout=5)
+        written.append(messages)
+
+    writer = ChatHistoryWriter(slow_save)
+    messages = [{"role": "user", "content": "one"}]
+    writer.schedule(messages)
+    messages.append({"role": "user", "content": "two"})
+    release.set()
+    assert writer.flush(timeout=5)
+    writer.close()
+
+    assert written[0] == [{"role": "user", "content": "one"}]
+
+
+def test_chat_history_writer_logs_save_failures(caplog):
+    def failing_save(messages):
+        raise RuntimeError("disk full")
+
+    writer = ChatHistoryWriter(failing_save)
+    writer.schedule([{"role": "user", "content": "hi"}])
+    with pytest.raises(RuntimeError, match="disk full"):
+        writer.flush(timeout=5)
+    writer.close()
+
+    assert "disk full" in caplog.text
+
+
+def test_chat_history_writer_raises_failure_on_next_schedule():
+    failures = [RuntimeError("disk full")]
+    written = []
+
+    def flaky_save(messages):
+        if failures:
+            raise failures.pop()
+        written.append(messages)
+
+    writer = ChatHistoryWriter(flaky_save)
+    writer.schedule([{"role": "user", "content": "one"}])
+    with writer._condition:
+        assert writer._condition.wait_for(lambda: writer._error is not None, 5)
+    with pytest.raises(RuntimeError, match="disk full"):
+        writer.schedule([{"role": "user", "content": "two"}])
+    assert writer.flush(timeout=5)
+    writer.close()
+
+    assert written == [[{"role": "user", "content": "two"}]]
+
+
+def test_save_memory_can_skip_terminal_announcement(tmp_path, capsys):
+    mem_file = str(tmp_path / "memory.json")
+    save_chat_history([{"role": "user", "content": "hi"}], mem_file, announce=False)
+    assert "Memory saved" not in capsys.readouterr().out
@@ -13,7 +13,7 @@ def make_store(monkeypatch):
         def __init__(self, *a, **k):
             self.embeddings = MagicMock()
 
-    with patch("src.services.memory.vector_store.pool.SimpleConnectionPool"):
+    with patch("src.services.memory.vector_store.pool.ThreadedConnectionPool"):
         with patch("src.services.memory.vector_store.OpenAI", DummyOpenAI):
             return MemoryStore()
 
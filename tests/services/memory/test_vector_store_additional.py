@@ -11,7 +11,7 @@ def make_store(monkeypatch):
         def __init__(self, *a, **k):
             self.embeddings = MagicMock()
 
-    with patch("src.services.memory.vector_store.pool.SimpleConnectionPool"):
+    with patch("src.services.memory.vector_store.pool.ThreadedConnectionPool"):
         with patch("src.services.memory.vector_store.OpenAI", DummyOpenAI):
             from src.services.memory.vector_store import MemoryStore
 
@@ -22,9 +22,9 @@ def test_init_pool_raises(monkeypatch):
     monkeypatch.setenv("OPENAI_API_KEY", "x")
     monkeypatch.setenv("MEMORY_DB_URL", "postgresql://x")
 
-    # Make SimpleConnectionPool raise psycopg2.Error
+    # Make ThreadedConnectionPool raise psycopg2.Error
     with patch(
-        "src.services.memory.vector_store.pool.SimpleConnectionPool",
+        "src.services.memory.vector_store.pool.ThreadedConnectionPool",
         side_effect=psycopg2.Error("boom"),
     ):
         from importlib import reload
@@ -9,7 +9,7 @@ def make_store(monkeypatch):
         def __init__(self, *a, **k):
             self.embeddings = MagicMock()
 
-    with patch("src.services.memory.vector_store.pool.SimpleConnectionPool"):
+    with patch("src.services.memory.vector_store.pool.ThreadedConnectionPool"):
         with patch("src.services.memory.vector_store.OpenAI", DummyOpenAI):
             from src.services.memory.vector_store import MemoryStore
 
@@ -14,12 +14,33 @@ def test_rate_limit_decorator():
         dummy()
 
 
+def test_token_bucket_refills_over_time(monkeypatch):
+    import src.services.memory.vector_store as memmod
+
+    now = [100.0]
+    monkeypatch.setattr(memmod.time, "monotonic", lambda: now[0])
+    bucket = memmod.TokenBucket(capacity=2, period=10.0)
+
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == pytest.approx(5.0)
+
+    now[0] += 5.0
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == pytest.approx(5.0)
+
+    now[0] += 60.0
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() > 0.0
+
+
 def test_get_embedding_errors(monkeypatch):
     # Ensure environment variables are set for instantiation
     monkeypatch.setenv("OPENAI_API_KEY", "x")
     monkeypatch.setenv("MEMORY_DB_URL", "postgresql://x")
     # Patch connection pool to avoid DB init
-    with patch("src.services.memory.vector_store.pool.SimpleConnectionPool"):
+    with patch("src.services.memory.vector_store.pool.ThreadedConnectionPool"):
         # Replace the exception classes in memory module with simple Exception subclasses
         import src.services.memory.vector_store as memmod
 
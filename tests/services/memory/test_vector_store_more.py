@@ -11,8 +11,8 @@ def make_store(monkeypatch):
         def __init__(self, *a, **k):
             self.embeddings = MagicMock()
 
-    # Patch SimpleConnectionPool and OpenAI during instantiation
-    with patch("src.services.memory.vector_store.pool.SimpleConnectionPool"):
+    # Patch ThreadedConnectionPool and OpenAI during instantiation
+    with patch("src.services.memory.vector_store.pool.ThreadedConnectionPool"):
         with patch("src.services.memory.vector_store.OpenAI", DummyOpenAI):
             from src.services.memory.vector_store import MemoryStore
 
@@ -27,7 +27,7 @@ def test_memory_init_missing_env(monkeypatch):
 
     with patch("src.services.memory.vector_store.get_settings") as mock_settings:
         mock_settings.side_effect = Exception("No settings")
-        with patch("src.services.memory.vector_store.pool.SimpleConnectionPool"):
+        with patch("src.services.memory.vector_store.pool.ThreadedConnectionPool"):
             with pytest.raises(ValueError):
                 memmod.MemoryStore()
 
@@ -79,6 +79,40 @@ def test_get_embedding_cached(monkeypatch):
     assert t1 == t2
 
 
+def test_get_embedding_cached_is_bounded_lru(monkeypatch):
+    store = make_store(monkeypatch)
+    store.EMBEDDING_CACHE_MAX = 2
+    calls = []
+    store._get_embedding = lambda text: calls.append(text) or [0.1]
+
+    store._get_embedding_cached("a")
+    store._get_embedding_cached("b")
+    store._get_embedding_cached("a")
+    store._get_embedding_cached("c")
+    store._get_embedding_cached("a")
+    store._get_embedding_cached("b")
+
+    assert calls == ["a", "b", "c", "b"]
+
+
+def test_recall_reuses_cached_query_embedding(monkeypatch):
+    store = make_store(monkeypatch)
+    store.openai_client.embeddings.create.return_value.data = [
+        MagicMock(embedding=[0.1, 0.2])
+    ]
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = []
+    store._get_connection = lambda: conn
+
+    store.recall("same question")
+    store.recall("same question")
+
+    store.openai_client.embeddings.create.assert_called_once()
+    recall_params = [c[0][1] for c in cursor.execute.call_args_list if "<=>" in c[0][0]]
+    assert recall_params[-1][1] == [0.1, 0.2]
+
+
 def test_forget_list_stats_db_errors(monkeypatch):
     store = make_store(monkeypatch)
 